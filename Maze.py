@@ -2,38 +2,64 @@
 maze_dungeon_hint_ui_patched_v4.py
 - HUD word-wrap + vertical scrollbar (mouse wheel & draggable thumb)
 - Keeps minimap visible when HUD minimized and draggable
+- Endless mode (--endless): chunked world generated on demand
+- Game rules run in maze_core.MazeState; this file is the pygame front-end
 - All prior features retained
 """
 
+import time
+LAUNCHED_AT = time.perf_counter()  # startup is timed from here, before pygame is imported
+
 import pygame
 import random
-import time
+import argparse
 import math
-import tempfile
 import wave
-import struct
 import os
+import sys
+import io
 import json
+import hashlib
+import operator
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict
+from array import array
+from fractions import Fraction
+from itertools import islice, repeat
+
+from maze_core import (
+    MazeState, MAX_LEVEL, GENERATOR_VERSION, PINGER_SHOW_SEC, ENDLESS_VIEW,
+    EVENT_EXIT, EVENT_BEACON, EVENT_BLOCKED, ACTION_DELTAS, ACTION_HINT, GLOW_DURATION, build_level,
+)
+from maze_journal import RunJournal, JOURNAL_FILE
+from maze_replay import ReplayRecorder, ReplayPlayer, load_replay, CODE_LEVEL
+from maze_profiler import FrameProfiler
+from maze_pack import LevelPack
+from maze_difficulty import load_seed_table
 
 # ---------- Config ----------
 FPS = 60
+CLEARED_OVERLAY_SEC = 3.0  # level-complete summary shown this long
+AUDIO_POLL_SEC = 0.1   # how often a pending audio job is checked while otherwise idle
+PROFILE_OVERLAY_SEC = 0.5  # frame profiler overlay (F3) refresh interval
 BASE_TILE = 24
 HUD_WIDTH = 300
 MARGIN = 8
 WINDOW_BG = (18, 18, 22)
 
-# Visibility
-BASE_REVEAL_RADIUS = 3
-GLOW_DURATION = 0.7  # seconds glow remains visible after movement (transient)
-
-# Pinger / hint
-PINGER_SHOW_SEC = 2.0  # arrow visible for this many seconds when clicked
-
 # Sound / audio
 SAMPLE_RATE = 44100
 MAX_AMPLITUDE = 32767
 AMBIENT_LENGTH = 8.0
-_temp_sound_files = []
+AUDIO_NOISE_SEED = 1337
+AUDIO_SYNTH_VERSION = 1  # bump when synthesis output changes so cached clips are rebuilt
+AUDIO_CACHE_MAX_BYTES = 32 * 1024 * 1024
+AUDIO_MEMORY_MAX_BYTES = 16 * 1024 * 1024
+TEXT_CACHE_SIZE = 256  # rendered text surfaces kept (LRU)
+FONT_NAME = "Consolas"
+FONT_CACHE_FILE = "fonts.json"  # in user_cache_dir(): font files resolved on an earlier launch
+PREFETCH_REGEN_CANDIDATES = 2  # levels prepared ahead for R (regenerate)
 
 # Colors (default and minimap)
 COLOR_WALL = (40, 40, 50)
@@ -47,6 +73,8 @@ COLOR_MINIMAP_WALL = (40, 40, 50)
 COLOR_MINIMAP_FLOOR_VISIBLE = (90, 90, 70)
 COLOR_MINIMAP_FLOOR_HIDDEN = (18, 18, 22)
 COLOR_MINIMAP_PLAYER = (120, 220, 140)
+# bytes.translate tables turning tile bytes (0 floor, 1 wall) into one minimap colour channel each
+MINIMAP_CHANNELS = [bytes([COLOR_MINIMAP_FLOOR_HIDDEN[c], COLOR_MINIMAP_WALL[c]]) + bytes(254) for c in range(3)]
 COLOR_HINT_FLASH = (220, 20, 20)
 COLOR_PINGER_ARROW = (220, 40, 40, 240)  # RGBA for arrow surface
 COLOR_BUTTON = (36,36,40)
@@ -69,8 +97,12 @@ LEVEL_FLOOR_COLORS = {
     10: (210, 210, 150),
 }
 
-# record file path (per-user)
+# run journal directory (per-user); RECORD_FILE is the old best-times file, imported once
+JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".maze_dungeon")
 RECORD_FILE = os.path.join(os.path.expanduser("~"), ".maze_dungeon_records.json")
+# every session's inputs (see maze_replay); only the newest REPLAY_KEEP are kept
+REPLAY_DIR = os.path.join(JOURNAL_DIR, "replays")
+REPLAY_KEEP = 50
 
 MOVE_KEYS = {
     pygame.K_w: (0, -1), pygame.K_UP: (0, -1),
@@ -79,198 +111,580 @@ MOVE_KEYS = {
     pygame.K_d: (1, 0),  pygame.K_RIGHT: (1, 0),
 }
 
-# Level sizes
-LEVEL_MAP = {
-    1: (31, 21),
-    2: (41, 27),
-    3: (55, 35),
-    4: (65, 45),
-    5: (75, 50),
-    6: (85, 54),
-    7: (95, 56),
-    8: (100, 58),
-    9: (105, 60),
-    10: (110, 62),
-}
-
-# ---------- audio helpers (same as before, kept minimal) ----------
+# ---------- audio helpers ----------
+# Signals are array('d') buffers of floats in [-1, 1]. Every helper works on the
+# whole buffer through map()/slicing so the per-sample loop runs in C instead of
+# the interpreter (an 8s ambient loop is ~350k samples per signal).
 def clamp(v, a, b):
     return max(a, min(b, v))
 
+def silence(total):
+    return array("d", bytes(8 * max(0, total)))
+
+def _period_samples(freq, sr):
+    # smallest whole number of samples after which sin(2*pi*freq*i/sr) repeats exactly
+    ratio = Fraction(sr) / Fraction(repr(float(freq))).limit_denominator(10**6)
+    return ratio.numerator
+
+def _sine_curve(freq, total, base, depth, sr):
+    # base + depth*sin(2*pi*freq*i/sr) for i in range(total); one period is computed, the rest tiled
+    step = 2*math.pi*freq/sr
+    period = _period_samples(freq, sr) if freq > 0 else total
+    n = min(total, period)
+    cycle = array("d", map(depth.__mul__, map(math.sin, map(step.__mul__, range(n)))))
+    if base:
+        cycle = array("d", map(base.__add__, cycle))
+    if n < total:
+        cycle = (cycle * (total // n + 1))[:total]
+    return cycle
+
 def generate_sine_wave(freq, duration, vol=0.3, sr=SAMPLE_RATE):
-    total = int(duration * sr)
-    return [math.sin(2*math.pi*freq*(i/sr)) * vol for i in range(total)]
+    return _sine_curve(freq, int(duration * sr), 0.0, vol, sr)
 
-def generate_noise(duration, vol=0.2, sr=SAMPLE_RATE):
+def generate_noise(duration, vol=0.2, sr=SAMPLE_RATE, rng=None):
     total = int(duration * sr)
-    return [random.uniform(-1.0, 1.0)*vol for _ in range(total)]
+    rnd = (rng or random).random
+    # random.uniform(-1.0, 1.0) * vol for every sample, without a Python call per sample
+    return array("d", map((-vol).__add__, map((2.0*vol).__mul__, islice(iter(rnd, None), total))))
+
+def pad_signal(sig, total):
+    if len(sig) >= total:
+        return sig
+    return sig + silence(total - len(sig))
+
+def normalize(sig, peak=1.0):
+    # only scales down, like the old mix step did
+    maxv = max(max(sig, default=0.0), -min(sig, default=0.0))
+    if maxv > peak:
+        return array("d", map(operator.truediv, sig, repeat(maxv / peak)))
+    return sig
 
 def mix_signals(signals):
     length = max((len(s) for s in signals), default=0)
-    out = [0.0]*length
+    out = None
     for s in signals:
-        for i, v in enumerate(s):
-            out[i] += v
-    maxv = max((abs(x) for x in out), default=1.0)
-    if maxv > 1.0:
-        out = [x/maxv for x in out]
-    return out
-
-def write_wav(samples, path, sr=SAMPLE_RATE):
+        if out is None:
+            out = pad_signal(array("d", s), length)
+        elif len(s) == length:
+            out = array("d", map(operator.add, out, s))
+        else:
+            out[:len(s)] = array("d", map(operator.add, out, s))
+    return normalize(out if out is not None else silence(0))
+
+def apply_envelope(sig, env):
+    return array("d", map(operator.mul, sig, env))
+
+def lfo(total, freq, base, depth, sr=SAMPLE_RATE):
+    # base + depth*sin(2*pi*freq*t) modulation curve
+    return _sine_curve(freq, total, base, depth, sr)
+
+def exp_decay_envelope(total, rate, sr=SAMPLE_RATE):
+    # exp(-rate * t) with t in seconds
+    k = -rate / sr
+    return array("d", map(math.exp, map(k.__mul__, range(total))))
+
+def hold_decay_envelope(total, hold_frac, rate):
+    # 1.0 for the first hold_frac of the clip, then exp(-rate * i/total)
+    hold = min(total, math.ceil(hold_frac * total))
+    k = -rate / total if total else 0.0
+    tail = array("d", map(math.exp, map(k.__mul__, range(hold, total))))
+    return array("d", [1.0]) * hold + tail
+
+def encode_pcm16(samples):
+    # clamp to [-1, 1] and truncate to little-endian signed 16-bit
+    if len(samples) and (max(samples) > 1.0 or min(samples) < -1.0):
+        samples = map(max, repeat(-1.0), map(min, repeat(1.0), samples))
+    pcm = array("h", map(int, map(float(MAX_AMPLITUDE).__mul__, samples)))
+    if sys.byteorder == "big":
+        pcm.byteswap()
+    return pcm.tobytes()
+
+def write_pcm_wav(pcm, path, sr=SAMPLE_RATE):
     with wave.open(path, "wb") as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(sr)
-        frames = b"".join(struct.pack("<h", int(clamp(s, -1.0, 1.0)*MAX_AMPLITUDE)) for s in samples)
-        wf.writeframes(frames)
-
-def make_temp_wav(samples):
-    fd, path = tempfile.mkstemp(suffix=".wav")
-    os.close(fd)
-    write_wav(samples, path)
-    _temp_sound_files.append(path)
-    return path
-
-def make_ambient(tier):
+        wf.writeframes(pcm)
+
+def pcm_to_sound(pcm):
+    # hand the clip to the mixer from memory: raw samples when the mixer already runs
+    # at our format, otherwise an in-memory WAV that SDL converts once
+    if pygame.mixer.get_init() == (SAMPLE_RATE, -16, 1):
+        return pygame.mixer.Sound(buffer=pcm)
+    buf = io.BytesIO()
+    write_pcm_wav(pcm, buf)
+    buf.seek(0)
+    return pygame.mixer.Sound(file=buf)
+
+def synth_ambient(tier, rng=None):
     dur = AMBIENT_LENGTH
+    total = int(dur*SAMPLE_RATE)
     if tier == 1:
         s1 = generate_sine_wave(60, dur, 0.18)
         s2 = generate_sine_wave(140, dur, 0.06)
-        n = generate_noise(dur, 0.02)
-        sig = mix_signals([s1, s2, n])
+        n = generate_noise(dur, 0.02, rng=rng)
+        return mix_signals([s1, s2, n])
     elif tier == 2:
         s1 = generate_sine_wave(45, dur, 0.22)
         s2 = generate_sine_wave(110, dur, 0.08)
-        n = generate_noise(dur, 0.03)
-        mod = [0.9 + 0.1*math.sin(2*math.pi*0.18*(i/SAMPLE_RATE)) for i in range(int(dur*SAMPLE_RATE))]
-        raw = mix_signals([s1, s2, n])
-        sig = [raw[i]*mod[i] for i in range(len(raw))]
+        n = generate_noise(dur, 0.03, rng=rng)
+        mod = lfo(total, 0.18, 0.9, 0.1)
     else:
         s1 = generate_sine_wave(32, dur, 0.28)
         s2 = generate_sine_wave(90, dur, 0.09)
-        n = generate_noise(dur, 0.06)
-        mod = [0.85 + 0.15*math.sin(2*math.pi*0.35*(i/SAMPLE_RATE)) for i in range(int(dur*SAMPLE_RATE))]
-        raw = mix_signals([s1, s2, n])
-        sig = [raw[i]*mod[i] for i in range(len(raw))]
-    return make_temp_wav(sig)
+        n = generate_noise(dur, 0.06, rng=rng)
+        mod = lfo(total, 0.35, 0.85, 0.15)
+    return apply_envelope(mix_signals([s1, s2, n]), mod)
 
-def make_exit_sfx(tier):
+def synth_exit_sfx(tier, rng=None):
     if tier == 1:
         a = generate_sine_wave(200, 0.15, vol=0.6)
         b = generate_sine_wave(320, 0.6, vol=0.22)
-        n = generate_noise(0.9, 0.05)
-        core = mix_signals([a + [0]*int(0.45*SAMPLE_RATE), b, n])
-        atten = [math.exp(-3.0*(i/SAMPLE_RATE)) for i in range(len(core))]
-        out = [core[i]*atten[i] for i in range(len(core))]
+        n = generate_noise(0.9, 0.05, rng=rng)
+        core = mix_signals([pad_signal(a, len(a) + int(0.45*SAMPLE_RATE)), b, n])
+        return apply_envelope(core, exp_decay_envelope(len(core), 3.0))
     elif tier == 2:
         a = generate_sine_wave(220, 0.45, vol=0.6)
         b = generate_sine_wave(440, 0.7, vol=0.25)
-        n = generate_noise(0.9, 0.06)
-        core = mix_signals([a + [0]*int(0.45*SAMPLE_RATE), b + [0]*int(0.2*SAMPLE_RATE), n])
-        atten = [math.exp(-3.0*(i/SAMPLE_RATE)) for i in range(len(core))]
-        out = [core[i]*atten[i] for i in range(len(core))]
+        n = generate_noise(0.9, 0.06, rng=rng)
+        core = mix_signals([pad_signal(a, len(a) + int(0.45*SAMPLE_RATE)),
+                            pad_signal(b, len(b) + int(0.2*SAMPLE_RATE)), n])
+        return apply_envelope(core, exp_decay_envelope(len(core), 3.0))
     else:
         t = 1.6
         s1 = generate_sine_wave(120, t, vol=0.9)
         s2 = generate_sine_wave(60, t, vol=0.6)
-        n = generate_noise(t, vol=0.35)
-        total = int(t*SAMPLE_RATE)
-        env = [(1.0 if (i/total) < 0.02 else math.exp(-6.0*((i/total)))) for i in range(total)]
+        n = generate_noise(t, vol=0.35, rng=rng)
         base = mix_signals([s1, s2, n])
-        out = [base[i]*env[i] for i in range(len(base))]
-    return make_temp_wav(out)
+        return apply_envelope(base, hold_decay_envelope(len(base), 0.02, 6.0))
 
-def make_hint_sfx(tier):
+def synth_hint_sfx(tier, rng=None):
     if tier == 1:
         s1 = generate_sine_wave(660, 0.12, 0.35)
         s2 = generate_sine_wave(880, 0.18, 0.18)
-        sig = mix_signals([s1, s2])
+        return mix_signals([s1, s2])
     elif tier == 2:
         s1 = generate_sine_wave(440, 0.14, 0.45)
         s2 = generate_sine_wave(660, 0.16, 0.2)
-        n = generate_noise(0.3, 0.02)
-        sig = mix_signals([s1, s2, n])
+        n = generate_noise(0.3, 0.02, rng=rng)
+        return mix_signals([s1, s2, n])
     else:
         s1 = generate_sine_wave(220, 0.25, 0.55)
-        n = generate_noise(0.6, 0.06)
-        sig = mix_signals([s1, n])
-    return make_temp_wav(sig)
+        n = generate_noise(0.6, 0.06, rng=rng)
+        return mix_signals([s1, n])
+
+AUDIO_CLIPS = {
+    "ambient": synth_ambient,
+    "exit": synth_exit_sfx,
+    "hint": synth_hint_sfx,
+}
+
+def audio_tier(level):
+    return 1 if level <= 2 else 2 if level <= 6 else 3
 
-def cleanup_temp_sounds():
-    for p in _temp_sound_files:
+def user_cache_dir():
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "maze_dungeon")
+
+def synthesize_clip(kind, tier):
+    # noise is drawn from a generator seeded by the clip key, so a clip is a pure function of its key
+    rng = random.Random(f"{AUDIO_NOISE_SEED}:{kind}:{tier}")
+    return encode_pcm16(AUDIO_CLIPS[kind](tier, rng=rng))
+
+# ---------- audio cache ----------
+class AudioCache:
+    """16-bit PCM clips keyed by (kind, tier, synthesis parameters).
+
+    Lookups go memory -> disk -> synthesize. The cache is key-addressed: disk
+    entries are named by the sha1 of the key, not of the PCM, because a lookup
+    only knows the key, and hashing the content would mean synthesizing the
+    clip first. Every parameter that shapes a clip is part of the key (bump
+    AUDIO_SYNTH_VERSION when the synthesis code changes), so one name never
+    refers to two different clips. Each file also carries a sha1 of its
+    payload, checked on load, so a torn or corrupted file is dropped and
+    rebuilt. The directory is capped at max_disk_bytes with least-recently-used
+    files evicted first.
+    """
+
+    MAGIC = b"MZPCM1"
+
+    def __init__(self, cache_dir=None, max_disk_bytes=AUDIO_CACHE_MAX_BYTES, max_memory_bytes=AUDIO_MEMORY_MAX_BYTES):
+        self.cache_dir = cache_dir or os.path.join(user_cache_dir(), "audio")
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.synth_count = 0
+
+    def key(self, kind, tier):
+        params = (kind, tier, SAMPLE_RATE, AMBIENT_LENGTH, MAX_AMPLITUDE, AUDIO_NOISE_SEED, AUDIO_SYNTH_VERSION)
+        return hashlib.sha1(repr(params).encode("utf-8")).hexdigest()
+
+    def get(self, kind, tier):
+        key = self.key(kind, tier)
+        pcm = self.memory.get(key)
+        if pcm is not None:
+            self.memory.move_to_end(key)
+            return pcm
+        pcm = self.load_disk(key)
+        if pcm is None:
+            pcm = synthesize_clip(kind, tier)
+            self.synth_count += 1
+            self.store_disk(key, pcm)
+        self.remember(key, pcm)
+        return pcm
+
+    def remember(self, key, pcm):
+        self.memory[key] = pcm
+        self.memory_bytes += len(pcm)
+        while self.memory_bytes > self.max_memory_bytes and len(self.memory) > 1:
+            _, old = self.memory.popitem(last=False)
+            self.memory_bytes -= len(old)
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + ".pcm")
+
+    def load_disk(self, key):
+        path = self.path_for(key)
         try:
-            os.remove(p)
-        except:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        head = len(self.MAGIC) + 20
+        pcm = data[head:]
+        if data[:len(self.MAGIC)] != self.MAGIC or hashlib.sha1(pcm).digest() != data[len(self.MAGIC):head]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
             pass
+        return pcm
 
-# ---------- maze generation ----------
-def generate_maze(width, height, seed=None):
-    if seed is not None:
-        random.seed(seed)
-    gw = width if width%2==1 else width+1
-    gh = height if height%2==1 else height+1
-    grid = [[1 for _ in range(gw)] for _ in range(gh)]
-    sx, sy = 1, 1
-    grid[sy][sx] = 0
-    stack = [(sx, sy)]
-    dirs = [(2,0),(-2,0),(0,2),(0,-2)]
-    while stack:
-        x, y = stack[-1]
-        neighbors = []
-        for dx, dy in dirs:
-            nx, ny = x+dx, y+dy
-            if 1 <= nx < gw-1 and 1 <= ny < gh-1 and grid[ny][nx] == 1:
-                neighbors.append((nx, ny, dx, dy))
-        if neighbors:
-            nx, ny, dx, dy = random.choice(neighbors)
-            wx, wy = x + dx//2, y + dy//2
-            grid[wy][wx] = 0
-            grid[ny][nx] = 0
-            stack.append((nx, ny))
+    def store_disk(self, key, pcm):
+        path = self.path_for(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(self.MAGIC)
+                f.write(hashlib.sha1(pcm).digest())
+                f.write(pcm)
+            os.replace(tmp, path)
+            self.evict_disk()
+        except OSError as e:
+            print("Audio cache write fail:", e)
+
+    def evict_disk(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pcm"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+AUDIO_CACHE = AudioCache()
+
+def prepare_tier_pcm(tier):
+    # worker entry point: PCM for every clip of a tier (disk cache or fresh synthesis)
+    return tier, {kind: AUDIO_CACHE.get(kind, tier) for kind in AUDIO_CLIPS}
+
+def make_worker_pool(max_workers=1):
+    # synthesis is CPU-bound pure Python, so prefer processes; spawn avoids forking
+    # a process that already has SDL threads running
+    try:
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    except Exception as e:
+        print("Process pool unavailable, using threads:", e)
+        return ThreadPoolExecutor(max_workers=max_workers)
+
+class SoundBank:
+    """Decoded pygame Sounds per (kind, tier), built once and reused for every playback."""
+
+    def __init__(self, cache=AUDIO_CACHE):
+        self.cache = cache
+        self.sounds = {}
+
+    def has_tier(self, tier):
+        return all((kind, tier) in self.sounds for kind in AUDIO_CLIPS)
+
+    def install(self, tier, clips):
+        # clips: {kind: pcm} prepared off the main thread
+        for kind, pcm in clips.items():
+            self.cache.remember(self.cache.key(kind, tier), pcm)
+            if (kind, tier) not in self.sounds:
+                self.sounds[(kind, tier)] = pcm_to_sound(pcm)
+
+    def get(self, kind, tier):
+        snd = self.sounds.get((kind, tier))
+        if snd is None:
+            snd = pcm_to_sound(self.cache.get(kind, tier))
+            self.sounds[(kind, tier)] = snd
+        return snd
+
+    def preload(self, tier):
+        return {kind: self.get(kind, tier) for kind in AUDIO_CLIPS}
+
+# ---------- level prefetch ----------
+class LevelPrefetcher:
+    """Builds the next level, and a few candidates for regenerating the current one (R),
+    on a worker process while the current level is played. submit(fn, *args) runs work
+    on the game's one worker (shared with audio preparation) and returns its future,
+    or None when there is no worker to run it; those levels are built in-process.
+
+    Seeds come from the MazeState's own RNG and build_level draws only from
+    random.Random(seed), so a level built in the worker is the one the game would
+    have built itself. Taking a prepared level is a swap, not a rebuild.
+    With a level pack (maze_pack.LevelPack) nothing is built: levels are read
+    from the pack when asked for, falling back to building any level it lacks.
+    """
+
+    def __init__(self, submit, candidates=PREFETCH_REGEN_CANDIDATES, pack=None):
+        self.submit_work = submit
+        self.candidates = candidates
+        self.pack = pack
+        self.next_job = None    # (level, fixed_seed, future)
+        self.regen_jobs = []    # [(level, future)]
+
+    def submit(self, level, seed):
+        return self.submit_work(build_level, level, seed)
+
+    def schedule(self, state):
+        # called when a level starts: queue its successor first, then R candidates
+        if self.pack is not None:
+            return
+        if state.endless:
+            self.cancel()
+            return
+        next_level = min(MAX_LEVEL, state.level + 1)
+        if self.next_job is None or self.next_job[:2] != (next_level, state.fixed_seed):
+            if self.next_job is not None:
+                self.next_job[2].cancel()
+                self.next_job = None
+            job = self.submit(next_level, state.choose_seed(next_level))
+            if job is not None:
+                self.next_job = (next_level, state.fixed_seed, job)
+        keep = []
+        for level, job in self.regen_jobs:
+            if level == state.level:
+                keep.append((level, job))
+            else:
+                job.cancel()
+        while len(keep) < self.candidates:
+            job = self.submit(state.level, state.random_seed(state.level))
+            if job is None:
+                break
+            keep.append((state.level, job))
+        self.regen_jobs = keep
+
+    def take_next(self, level, state):
+        # the future building `level` for this state (maybe still running), or None if
+        # something else is queued
+        if self.pack is not None:
+            job = Future()
+            job.set_result(self.pack.pick(level))
+            return job
+        job = self.next_job
+        if job is None or job[:2] != (level, state.fixed_seed):
+            return None
+        self.next_job = None
+        return job[2]
+
+    def take_regen(self, level):
+        # a finished R candidate for `level`, or None (the caller builds one itself)
+        if self.pack is not None:
+            return self.pack.pick(level)
+        for i, (lvl, job) in enumerate(self.regen_jobs):
+            if lvl == level and job.done() and not job.cancelled() and job.exception() is None:
+                del self.regen_jobs[i]
+                return job.result()
+        return None
+
+    def cancel(self):
+        if self.next_job is not None:
+            self.next_job[2].cancel()
+        for _, job in self.regen_jobs:
+            job.cancel()
+        self.next_job = None
+        self.regen_jobs = []
+
+def prepared_level(job):
+    # result of a finished prefetch future; None if there is none or it failed, in which
+    # case the level is built in-process
+    if job is None:
+        return None
+    try:
+        return job.result()
+    except Exception as e:
+        print("Level prepare fail:", e)
+        return None
+
+# ---------- fonts ----------
+# SysFont scans every installed font (fc-list on Linux) the first time it is asked for
+# anything. The file it would pick is remembered in the cache dir, so later launches open
+# it directly; a cached file that has disappeared is looked up again.
+def resolve_font(name, bold=False):
+    # (path, emulate_bold) as SysFont would choose; path None means pygame's default font
+    path = pygame.font.match_font(name, bold=bold)
+    if path is None:
+        return None, bold
+    if bold and path == pygame.font.match_font(name):
+        return path, True  # no bold face installed: SysFont emboldens the regular one
+    return path, False
+
+class FontCache:
+    """Font files by (name, bold), persisted as JSON between launches."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(user_cache_dir(), FONT_CACHE_FILE)
+        self.entries = {}
+        self.changed = False
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    self.entries = json.load(f)
+        except Exception as e:
+            print("Font cache unreadable:", e)
+
+    def get(self, name, size, bold=False):
+        key = f"{name}|{'bold' if bold else 'regular'}"
+        entry = self.entries.get(key)
+        if entry is None or (entry[0] is not None and not os.path.exists(entry[0])):
+            entry = self.entries[key] = list(resolve_font(name, bold))
+            self.changed = True
+        path, emulate_bold = entry
+        try:
+            font = pygame.font.Font(path, size)
+        except Exception as e:
+            print("Font load fail:", e)
+            return pygame.font.SysFont(name, size, bold=bold)
+        if emulate_bold:
+            font.set_bold(True)
+        return font
+
+    def save(self):
+        if not self.changed:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+            self.changed = False
+        except Exception as e:
+            print("Font cache save fail:", e)
+
+# ---------- profiling ----------
+# Phase timings and counters for every frame (see maze_profiler); F3 shows them in game.
+PROFILER = FrameProfiler()
+
+# ---------- text cache ----------
+class TextCache:
+    """Rendered text surfaces keyed by (text, font, color), least recently used dropped first."""
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, text, font, color):
+        key = (text, font, color)
+        surf = self.surfaces.get(key)
+        if surf is None:
+            surf = font.render(text, True, color)
+            PROFILER.count("font_render")
+            PROFILER.count("surface_alloc")
+            if pygame.display.get_surface() is not None:
+                surf = surf.convert_alpha()
+                PROFILER.count("surface_alloc")
+            self.surfaces[key] = surf
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
         else:
-            stack.pop()
-    return grid
-
-def find_open_positions(grid):
-    pos = []
-    for y, row in enumerate(grid):
-        for x, v in enumerate(row):
-            if v == 0:
-                pos.append((x,y))
-    return pos
-
-def manhattan(a,b):
-    return abs(a[0]-b[0]) + abs(a[1]-b[1])
+            self.surfaces.move_to_end(key)
+        return surf
 
 # ---------- game ----------
+SCENE_PLAY = "play"
+SCENE_CLEARED = "cleared"
+
 class MazeGame:
-    def __init__(self, level=1, fixed_seed=None):
-        pygame.init()
+    def __init__(self, level=1, fixed_seed=None, endless=False, replay=None, record=True, pack=None, seed_table=None):
+        # startup phases up to the first frame, reported by run() (see mark_startup)
+        self.startup = [("import", time.perf_counter() - LAUNCHED_AT)]
+        self.startup_mark = time.perf_counter()
+        self.first_frame_shown = False
+
+        # game rules live in a display-free MazeState; this class draws it and feeds it input.
+        # The level is built before any SDL subsystem starts.
+        # replay: (header, events) from maze_replay.load_replay, played instead of the keyboard;
+        # pack: a maze_pack.LevelPack levels are taken from instead of being generated;
+        # seed_table: {level: [seeds]} from maze_difficulty.load_seed_table that random seeds come from
+        self.recorder = None
+        self.pack = pack
+        if replay is not None:
+            self.replay = ReplayPlayer(*replay, base_time=time.time())
+            self.state = self.replay.state
+        else:
+            self.replay = None
+            if record:
+                self.recorder = self.open_recorder()
+            prepared = pack.pick(level) if pack is not None and not endless else None
+            self.state = MazeState(level=level, fixed_seed=fixed_seed, endless=endless, recorder=self.recorder,
+                                   prepared=prepared, seed_table=seed_table)
+        self.mark_startup("level")
+
+        # only the subsystems the game uses (pygame.init() would also start joystick, camera, ...)
+        pygame.display.init()
+        pygame.font.init()
         try:
-            pygame.mixer.init(frequency=SAMPLE_RATE)
+            pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=1)
         except:
             print("Audio disabled")
-        self.level = max(1, min(10, level))
-        self.fixed_seed = fixed_seed
-        self.moves = 0
-        self.start_time = time.time()
+        self.mark_startup("sdl_init")
+        # world coordinates of the top-left tile drawn (scrolls with the player in endless mode)
+        self.view_x0 = 0
+        self.view_y0 = 0
 
         self.ambient_channel = pygame.mixer.Channel(1) if pygame.mixer.get_init() else None
         self.sfx_channel = pygame.mixer.Channel(2) if pygame.mixer.get_init() else None
+        self.sound_bank = SoundBank() if pygame.mixer.get_init() else None
+        # background work (audio preparation, level prefetch) shares one worker process,
+        # started on first use (see submit_work)
+        self.workers = None
+        # background audio preparation: one job in flight, for the tier of the current level
+        self.audio_job = None
+        self.audio_job_tier = None
 
         self.fullscreen = False
         self.flags = pygame.RESIZABLE | pygame.DOUBLEBUF
 
-        # visibility
-        self.seen = set()           # kept but not used in movement-only mode
-        self.visible_ts = {}
-
-        # hint/pinger variables
-        self.pinger_active_until = 0.0
-        self.hint_count = 0
-
-        self.hint_sfx_path = None
-        self.exit_sfx_path = None
+        self.hint_sfx = None
+        self.exit_sfx = None
 
         # debug
         self.debug_show_exit = False
@@ -278,6 +692,34 @@ class MazeGame:
         # HUD minimized?
         self.hud_minimized = False
 
+        # minimap cache (see build_minimap_base / sync_minimap_glow)
+        self.mini_pixels = None
+        self.mini_native = None
+        self.mini_origin = None
+        self.mini_glow = {}
+        self.mini_scaled = None
+        self.mini_dirty = True
+        self.mini_route_surface = None
+        self.mini_route_shown = False
+        self.mini_key = None
+
+        # dirty-rectangle renderer state (see draw)
+        self.full_redraw = True
+        self.maze_surface = None
+        self.maze_origin = None
+        self.maze_painted = {}      # world tile -> colour currently on maze_surface
+        self.sprite_tiles = set()   # world tiles covered by last frame's sprites
+        self.sprite_key = None
+        self.hud_key = None
+        self.top_key = None
+        self.top_rect = pygame.Rect(0, 0, 0, 0)
+        self.reminder_rect = pygame.Rect(0, 0, 0, 0)
+
+        # frame profiler overlay (F3)
+        self.profile_overlay = False
+        self.profile_rect = pygame.Rect(0, 0, 0, 0)
+        self.profile_next = 0.0
+
         # rectangles for clickable buttons (populated in draw)
         self.hint_button_rect = None
         self.minimize_button_rect = None
@@ -287,34 +729,87 @@ class MazeGame:
         self.hud_dragging_scroll = False
         self.hud_scroll_drag_offset = 0.0
 
+        # HUD text: wrapped paragraphs (see hud_layout) and rendered surfaces
+        self.hud_layout_key = None
+        self.hud_layout_cache = None
+        self.text_cache = TextCache()
+
         # minimap floating state (position & size). Will be set on first draw if None.
         self.mini_w = 220
         self.mini_h = 140
         self.mini_pos = None  # (x,y)
+        self.mini_vacated = None  # outline rect the minimap was dragged away from, until draw() uncovers it
         self.dragging_minimap = False
         self.drag_offset = (0,0)
 
-        # records (load persisted best times)
-        self.records = self.load_records()
+        # records (every finished run, see maze_journal)
+        self.journal = self.open_journal()
+        self.mark_startup("journal")
 
-        self.generate_for_level(self.level)
+        # scene state (see on_exit_found)
+        self.scene = SCENE_PLAY
+        self.cleared = None
+        self.cleared_surface = None
+        self.next_level_job = None
+        self.prefetcher = LevelPrefetcher(self.submit_work, pack=pack)
+
+        self.on_level_started()
+        self.mark_startup("level_setup")
 
         self.base_tile = BASE_TILE
         self.win_w = min(1400, self.grid_w * self.base_tile + HUD_WIDTH + MARGIN*3)
         self.win_h = min(900, max(self.grid_h * self.base_tile + MARGIN*2, 480))
         self.screen = pygame.display.set_mode((self.win_w, self.win_h), self.flags)
-        pygame.display.set_caption(f"Maze Dungeon — Level {self.level}")
+        pygame.display.set_caption(self.caption())
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Consolas", 16)
-        self.bigfont = pygame.font.SysFont("Consolas", 20, bold=True)
-        self.smallfont = pygame.font.SysFont("Consolas", 14)
+        self.mark_startup("display")
+        fonts = FontCache()
+        self.font = fonts.get(FONT_NAME, 16)
+        self.bigfont = fonts.get(FONT_NAME, 20, bold=True)
+        self.smallfont = fonts.get(FONT_NAME, 14)
+        fonts.save()
+        self.mark_startup("fonts")
         self.running = True
 
         self.update_render_metrics()
-        self.start_ambient()
+
+    def submit_work(self, fn, *args):
+        # future for fn(*args) on the shared worker, started on first use. A pool that cannot
+        # take work (e.g. BrokenProcessPool after the worker process died) is replaced by a
+        # thread; None if even that fails, and the caller does the work itself.
+        if self.workers is None:
+            self.workers = make_worker_pool(1)
+        try:
+            return self.workers.submit(fn, *args)
+        except Exception as e:
+            print("Worker fail, using a thread:", e)
+        try:
+            self.workers.shutdown(wait=False, cancel_futures=True)
+            self.workers = ThreadPoolExecutor(max_workers=1)
+            return self.workers.submit(fn, *args)
+        except Exception as e:
+            print("Thread worker fail:", e)
+            return None
+
+    def mark_startup(self, phase):
+        now = time.perf_counter()
+        self.startup.append((phase, now - self.startup_mark))
+        self.startup_mark = now
+
+    def on_first_frame(self):
+        # report time-to-first-frame, then start the background work held back for it
+        self.mark_startup("first_frame")
+        self.first_frame_shown = True
+        total = time.perf_counter() - LAUNCHED_AT
+        print(f"First frame after {total * 1000:.0f} ms (" +
+              ", ".join(f"{phase} {sec * 1000:.0f}" for phase, sec in self.startup) + ")")
+        PROFILER.note("startup", total_ms=round(total * 1000, 3),
+                      phases={phase: round(sec * 1000, 3) for phase, sec in self.startup})
+        if self.replay is None:
+            self.prefetcher.schedule(self.state)
 
     # ---------- records persistence ----------
-    def load_records(self):
+    def load_legacy_records(self):
         try:
             if os.path.exists(RECORD_FILE):
                 with open(RECORD_FILE, "r") as f:
@@ -323,12 +818,24 @@ class MazeGame:
             print("Failed to load records:", e)
         return {}  # { "1": seconds_float, ... }
 
-    def save_records(self):
+    def open_journal(self):
+        # the legacy file is only read while the journal is still empty
+        legacy = None
+        if not os.path.exists(os.path.join(JOURNAL_DIR, JOURNAL_FILE)):
+            legacy = self.load_legacy_records()
+        return RunJournal(JOURNAL_DIR, legacy_records=legacy)
+
+    def open_recorder(self):
         try:
-            with open(RECORD_FILE, "w") as f:
-                json.dump(self.records, f)
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            old = sorted(name for name in os.listdir(REPLAY_DIR) if name.endswith(".mzr"))
+            for name in old[:max(0, len(old) - REPLAY_KEEP + 1)]:
+                os.remove(os.path.join(REPLAY_DIR, name))
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.mzr"
+            return ReplayRecorder(open(os.path.join(REPLAY_DIR, name), "wb"))
         except Exception as e:
-            print("Failed to save records:", e)
+            print("Replay recording disabled:", e)
+            return None
 
     # ---------- floor color helper ----------
     def get_floor_color(self, level):
@@ -354,37 +861,49 @@ class MazeGame:
 
     def generate_hud_lines(self, x_text, pad):
         # Compose HUD paragraphs into a list of wrapped lines with prefixes where needed.
-        max_w = HUD_WIDTH - pad*2 - 12  # leave room for scrollbar
+        # Only the stats change while playing; the wrapped paragraphs come from hud_layout().
         lines = []
         # Title (single line)
         lines.append(("MAZE DUNGEON", self.bigfont, COLOR_TEXT))
         lines.append(("", self.font, COLOR_TEXT))  # spacer
 
-        # Basic stats - these are dynamic; we'll place placeholders and render with format later
-        elapsed = int(time.time() - self.start_time)
+        # Basic stats - these are dynamic (never wrapped, so the line count is fixed)
+        elapsed = int(self.state.elapsed())
         stats = [
-            (f"Level: {self.level} / 10", self.font, COLOR_STATS),
+            (f"Level: Endless — beacons {self.state.beacons_found}" if self.state.endless else f"Level: {self.state.level} / 10", self.font, COLOR_STATS),
             (f"Time: {elapsed}s", self.font, COLOR_STATS),
-            (f"Moves: {self.moves}", self.font, COLOR_STATS),
-            (f"Reveal radius: {self.reveal_radius} tiles", self.font, COLOR_STATS),
-            (f"Seed: {self.seed_used}", self.font, COLOR_STATS),
+            (f"Moves: {self.state.moves}", self.font, COLOR_STATS),
+            (f"Reveal radius: {self.state.reveal_radius} tiles", self.font, COLOR_STATS),
+            (f"Seed: {self.state.seed_used}", self.font, COLOR_STATS),
             ("", self.font, COLOR_TEXT),
         ]
         for item in stats:
             lines.append(item)
+        lines.extend(self.hud_layout(pad)[0])
+        return lines
 
+    def hud_layout(self, pad):
+        # (static wrapped lines, total content height), rebuilt only when the fonts,
+        # width or mode change
+        max_w = HUD_WIDTH - pad*2 - 12  # leave room for scrollbar
+        key = (self.font, self.bigfont, max_w, self.state.endless)
+        if self.hud_layout_key == key:
+            return self.hud_layout_cache
+        lines = []
         # OBJECTIVE
         lines.append(("OBJECTIVE:", self.font, COLOR_TEXT))
-        obj_lines = self.wrap_text_to_lines("Step on the invisible EXIT tile to advance to the next level.", self.font, max_w)
+        objective = ("Find the invisible BEACON; a new one appears further out each time." if self.state.endless
+                     else "Step on the invisible EXIT tile to advance to the next level.")
+        obj_lines = self.wrap_text_to_lines(objective, self.font, max_w)
         for l in obj_lines:
             lines.append((l, self.font, COLOR_STATS))
         lines.append(("", self.font, COLOR_TEXT))
 
         # EXIT HINTS
         lines.append(("EXIT HINTS:", self.font, COLOR_TEXT))
-        eh1 = self.wrap_text_to_lines("- Click HINT to show an arrow toward the exit.", self.font, max_w)
+        eh1 = self.wrap_text_to_lines("- Click HINT to show the route toward the exit.", self.font, max_w)
         for l in eh1: lines.append((l, self.font, COLOR_STATS))
-        eh2 = self.wrap_text_to_lines(f"- Arrow visible for {PINGER_SHOW_SEC:.0f} seconds. Hints counted above.", self.font, max_w)
+        eh2 = self.wrap_text_to_lines(f"- Route visible for {PINGER_SHOW_SEC:.0f} seconds. Hints counted above.", self.font, max_w)
         for l in eh2: lines.append((l, self.font, COLOR_STATS))
         lines.append(("", self.font, COLOR_TEXT))
 
@@ -406,6 +925,7 @@ class MazeGame:
             "R - Regenerate level",
             "N - Next level (skip/test)",
             "F11 - Fullscreen",
+            "F3 - Frame profiler",
             "D - Debug: reveal exit",
             "Q / ESC - Quit",
         ]
@@ -415,68 +935,52 @@ class MazeGame:
                 lines.append((l, self.font, COLOR_STATS))
         lines.append(("", self.font, COLOR_TEXT))
 
-        return lines
-
-    def generate_for_level(self, level):
-        self.level = max(1, min(10, level))
-        w, h = LEVEL_MAP.get(self.level, (33,21))
-        seed = self.fixed_seed if self.fixed_seed is not None else random.randint(0, 2**30)
-        self.seed_used = seed
-        base_grid = generate_maze(w, h, seed=seed)
-
-        grid = [row[:] for row in base_grid]
-        if self.level >= 3:
-            extra_wall_chance = 0.04 + (self.level - 3) * 0.015
-            opens = find_open_positions(grid)
-            random.shuffle(opens)
-            attempts = int(len(opens) * extra_wall_chance)
-            for i in range(attempts):
-                x,y = opens[i]
-                if (x,y) == (1,1): continue
-                nopen = sum(1 for dx,dy in [(1,0),(-1,0),(0,1),(0,-1)]
-                            if 0 <= x+dx < len(grid[0]) and 0 <= y+dy < len(grid) and grid[y+dy][x+dx] == 0)
-                if nopen >= 2 and random.random() < extra_wall_chance:
-                    grid[y][x] = 1
-
-        self.grid = grid
-        self.grid_w = len(grid[0])
-        self.grid_h = len(grid)
-        opens = find_open_positions(grid)
-        self.player_pos = min(opens, key=lambda p: p[0] + p[1])
-        self.exit_pos = max(opens, key=lambda p: manhattan(p, self.player_pos))
-
-        if self.level == 1:
-            self.reveal_radius = BASE_REVEAL_RADIUS + 1
+        # title + spacer + 6 stat lines precede these
+        head_h = self.bigfont.get_linesize() + 7 * self.font.get_linesize()
+        content_h = head_h + sum(font.get_linesize() for (_, font, _) in lines)
+        self.hud_layout_key = key
+        self.hud_layout_cache = (lines, content_h)
+        return self.hud_layout_cache
+
+    def caption(self):
+        suffix = " (replay)" if self.replay is not None else ""
+        if self.state.endless:
+            return "Maze Dungeon — Endless" + suffix
+        return f"Maze Dungeon — Level {self.state.level}" + suffix
+
+    def generate_for_level(self, level, prepared=None, seed=None):
+        self.state.generate_for_level(level, prepared, seed)
+        self.on_level_started()
+
+    def on_level_started(self):
+        if self.state.endless:
+            # grid_w/grid_h become the size of the scrolling view over the unbounded world
+            self.grid_w, self.grid_h = ENDLESS_VIEW
         else:
-            self.reveal_radius = max(2, BASE_REVEAL_RADIUS - 1)
+            self.grid_w = self.state.grid.width
+            self.grid_h = self.state.grid.height
 
         # floor color for this level
-        self.floor_color = self.get_floor_color(self.level)
-
-        self.seen.clear()
-        self.visible_ts.clear()
-        self.register_current_visibility(initial=True)
-
-        self.moves = 0
-        self.start_time = time.time()
-        self.hint_count = 0
-        self.pinger_active_until = 0.0
-        self.hint_last_time = None
+        self.floor_color = self.get_floor_color(self.state.level)
+        self.update_view()
+        self.mini_native = None
+        self.mini_glow = {}
+        self.sync_minimap_glow()
+        self.request_full_redraw()
+        if self.replay is None and self.first_frame_shown:
+            self.prefetcher.schedule(self.state)  # the first level's is held back until on_first_frame
 
         self.start_ambient()
 
-    def register_current_visibility(self, initial=False):
-        px, py = self.player_pos
-        now = time.time()
-        r = self.reveal_radius
-        xmin = max(0, px - r)
-        xmax = min(self.grid_w - 1, px + r)
-        ymin = max(0, py - r)
-        ymax = min(self.grid_h - 1, py + r)
-        for y in range(ymin, ymax + 1):
-            for x in range(xmin, xmax + 1):
-                if self.grid[y][x] == 0 and manhattan((x, y), (px, py)) <= r:
-                    self.visible_ts[(x, y)] = now
+    def update_view(self):
+        # finite levels are drawn whole; the endless view follows the player
+        if self.state.endless:
+            px, py = self.state.player_pos
+            self.view_x0 = px - self.grid_w // 2
+            self.view_y0 = py - self.grid_h // 2
+        else:
+            self.view_x0 = 0
+            self.view_y0 = 0
 
     def start_ambient(self):
         try:
@@ -484,24 +988,59 @@ class MazeGame:
                 self.ambient_channel.stop()
         except:
             pass
-        tier = 1 if self.level <= 2 else 2 if self.level <= 6 else 3
+        # play silently until the tier's clips are ready; poll_audio attaches them
+        self.exit_sfx = None
+        self.hint_sfx = None
+        if not self.sound_bank:
+            return
+        tier = audio_tier(self.state.level)
+        if self.audio_job is not None:
+            if self.audio_job_tier == tier:
+                return  # already being prepared
+            self.audio_job.cancel()  # stale: the player moved on to another tier
+            self.audio_job = None
+        if self.sound_bank.has_tier(tier):
+            self.attach_audio(tier)
+            return
+        self.audio_job = self.submit_work(prepare_tier_pcm, tier)
+        self.audio_job_tier = tier
+        if self.audio_job is None:
+            self.audio_job = Future()  # no worker: prepare it here, poll_audio installs it
+            try:
+                self.audio_job.set_result(prepare_tier_pcm(tier))
+            except Exception as e:
+                self.audio_job.set_exception(e)
+
+    def poll_audio(self):
+        job = self.audio_job
+        if job is None or not job.done():
+            return
+        self.audio_job = None
+        if job.cancelled():
+            return
         try:
-            amb_path = make_ambient(tier)
-            if pygame.mixer.get_init():
-                sound = pygame.mixer.Sound(amb_path)
-                vol = 0.22 if tier == 1 else 0.26 if tier == 2 else 0.36
-                self.ambient_channel.set_volume(vol)
-                self.ambient_channel.play(sound, loops=-1)
+            tier, clips = job.result()
+            self.sound_bank.install(tier, clips)
         except Exception as e:
-            print("Ambient start fail:", e)
+            print("Audio prepare fail:", e)
+            return
+        if tier == audio_tier(self.state.level):
+            self.attach_audio(tier)
+
+    def attach_audio(self, tier):
         try:
-            s_tier = 1 if self.level <= 2 else 2 if self.level <= 6 else 3
-            self.exit_sfx_path = make_exit_sfx(s_tier)
-            self.hint_sfx_path = make_hint_sfx(s_tier)
+            sounds = self.sound_bank.preload(tier)
         except Exception as e:
-            print("SFX gen fail:", e)
-            self.exit_sfx_path = None
-            self.hint_sfx_path = None
+            print("Audio load fail:", e)
+            return
+        try:
+            vol = 0.22 if tier == 1 else 0.26 if tier == 2 else 0.36
+            self.ambient_channel.set_volume(vol)
+            self.ambient_channel.play(sounds["ambient"], loops=-1)
+        except Exception as e:
+            print("Ambient start fail:", e)
+        self.exit_sfx = sounds["exit"]
+        self.hint_sfx = sounds["hint"]
 
     def update_render_metrics(self):
         w, h = self.screen.get_size()
@@ -516,28 +1055,46 @@ class MazeGame:
             self.draw_tile = self.base_tile
         self.maze_surface_w = self.grid_w * self.draw_tile
         self.maze_surface_h = self.grid_h * self.draw_tile
-        self.maze_surface = pygame.Surface((self.maze_surface_w, self.maze_surface_h))
+        size = (self.maze_surface_w, self.maze_surface_h)
+        if self.maze_surface is None or self.maze_surface.get_size() != size:
+            self.maze_surface = pygame.Surface(size).convert()
+            PROFILER.count("surface_alloc", 2)
 
-    def handle_input(self):
-        for event in pygame.event.get():
+    def handle_input(self, events=None):
+        for event in (pygame.event.get() if events is None else events):
             if event.type == pygame.QUIT:
                 self.running = False
                 return
             # KEYDOWN
             if event.type == pygame.KEYDOWN:
-                if event.key in MOVE_KEYS:
+                if self.scene == SCENE_CLEARED and event.key in (pygame.K_RETURN, pygame.K_SPACE):
+                    self.skip_cleared_overlay()
+                elif self.scene == SCENE_CLEARED and event.key in (pygame.K_r, pygame.K_n):
+                    pass  # the next level is already on its way
+                elif self.replay is not None and (event.key in MOVE_KEYS or event.key in (pygame.K_r, pygame.K_n, pygame.K_h)):
+                    pass  # the replay plays these
+                elif event.key in MOVE_KEYS:
                     dx, dy = MOVE_KEYS[event.key]
                     self.try_move(dx, dy)
                 elif event.key == pygame.K_r:
-                    self.fixed_seed = None
-                    self.generate_for_level(self.level)
+                    self.state.fixed_seed = None
+                    self.generate_for_level(self.state.level, self.prefetcher.take_regen(self.state.level))
                 elif event.key == pygame.K_n:
-                    self.level = min(10, self.level+1)
-                    self.generate_for_level(self.level)
+                    next_level = min(MAX_LEVEL, self.state.level + 1)
+                    job = self.prefetcher.take_next(next_level, self.state)
+                    if job is not None and not job.done():
+                        job.cancel()  # still queued or building: build it here rather than wait on the worker
+                        job = None
+                    self.generate_for_level(next_level, prepared_level(job))
                 elif event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
                     self.running = False
                 elif event.key == pygame.K_F11:
                     self.toggle_fullscreen()
+                elif event.key == pygame.K_F3:
+                    self.profile_overlay = not self.profile_overlay
+                    self.profile_next = 0.0
+                    if not self.profile_overlay:
+                        self.request_full_redraw()
                 elif event.key == pygame.K_d:
                     self.debug_show_exit = not self.debug_show_exit
                 elif event.key == pygame.K_h:
@@ -546,6 +1103,7 @@ class MazeGame:
                 elif event.key == pygame.K_m:
                     # toggle HUD fully hidden / restore
                     self.hud_minimized = not self.hud_minimized
+                    self.request_full_redraw()
             # Mouse down
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 mx, my = event.pos
@@ -560,10 +1118,8 @@ class MazeGame:
                     view_h = hud_rect.height - pad*2 - 40  # approx area used for content
                     scroll_x = hud_rect.right - 12
                     track_rect = pygame.Rect(scroll_x, hud_rect.y + pad + 8, 8, view_h)
-                    # compute content lines to get thumb pos
-                    lines = self.generate_hud_lines(hud_x + pad, pad)
-                    line_height = self.font.get_linesize()
-                    content_h = sum(font.get_linesize() if font != self.bigfont else self.bigfont.get_linesize() for (_, font, _) in lines)
+                    # cached content height gives the thumb pos
+                    content_h = self.hud_layout(pad)[1]
                     max_scroll = max(0, content_h - view_h)
                     if content_h > 0 and max_scroll > 0:
                         thumb_h = max(20, int(view_h * (view_h / content_h)))
@@ -585,10 +1141,11 @@ class MazeGame:
                             self.drag_offset = (mx - mini_x, my - mini_y)
                             continue
                 # otherwise check HUD buttons (only when HUD visible)
-                if getattr(self, "hint_button_rect", None) and self.hint_button_rect.collidepoint(mx, my):
+                if self.replay is None and getattr(self, "hint_button_rect", None) and self.hint_button_rect.collidepoint(mx, my):
                     self.trigger_hint()
                 if getattr(self, "minimize_button_rect", None) and self.minimize_button_rect.collidepoint(mx, my):
                     self.hud_minimized = not self.hud_minimized
+                    self.request_full_redraw()
             # Mouse up
             elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
                 if self.dragging_minimap:
@@ -611,7 +1168,10 @@ class MazeGame:
                     max_y = left_y + max(0, self.maze_surface_h - self.mini_h)
                     new_x = int(clamp(new_x, min_x, max_x))
                     new_y = int(clamp(new_y, min_y, max_y))
-                    self.mini_pos = (new_x, new_y)
+                    if (new_x, new_y) != self.mini_pos:
+                        if self.mini_vacated is None:
+                            self.mini_vacated = pygame.Rect(self.mini_pos[0]-4, self.mini_pos[1]-4, self.mini_w+8, self.mini_h+8)
+                        self.mini_pos = (new_x, new_y)
                 if self.hud_dragging_scroll:
                     # compute new hud_scroll based on mouse y
                     left_x = MARGIN
@@ -621,8 +1181,7 @@ class MazeGame:
                     view_h = hud_rect.height - pad*2 - 40
                     track_y = hud_rect.y + pad + 8
                     track_h = view_h
-                    lines = self.generate_hud_lines(hud_x + pad, pad)
-                    content_h = sum(font.get_linesize() if font != self.bigfont else self.bigfont.get_linesize() for (_, font, _) in lines)
+                    content_h = self.hud_layout(pad)[1]
                     max_scroll = max(0, content_h - view_h)
                     thumb_h = max(20, int(view_h * (view_h / content_h))) if content_h>0 else view_h
                     # compute relative position
@@ -646,14 +1205,17 @@ class MazeGame:
                     # clamp after updating
                     pad = 12
                     view_h = hud_rect.height - pad*2 - 40
-                    lines = self.generate_hud_lines(hud_x + pad, pad)
-                    content_h = sum(font.get_linesize() if font != self.bigfont else self.bigfont.get_linesize() for (_, font, _) in lines)
+                    content_h = self.hud_layout(pad)[1]
                     max_scroll = max(0, content_h - view_h)
                     self.hud_scroll = clamp(self.hud_scroll, 0, max_scroll)
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # the window was uncovered; dirty rects alone would leave stale areas
+                self.request_full_redraw()
             elif event.type == pygame.VIDEORESIZE:
                 self.win_w, self.win_h = event.w, event.h
                 self.screen = pygame.display.set_mode((self.win_w, self.win_h), self.flags)
                 self.update_render_metrics()
+                self.request_full_redraw()
 
     def toggle_fullscreen(self):
         self.fullscreen = not self.fullscreen
@@ -662,111 +1224,132 @@ class MazeGame:
         else:
             self.screen = pygame.display.set_mode((self.win_w, self.win_h), self.flags)
         self.update_render_metrics()
+        self.request_full_redraw()
 
     def try_move(self, dx, dy):
-        nx = self.player_pos[0] + dx
-        ny = self.player_pos[1] + dy
-        if 0 <= nx < self.grid_w and 0 <= ny < self.grid_h and self.grid[ny][nx] == 0:
-            self.player_pos = (nx, ny)
-            self.moves += 1
-            self.perform_move_visibility()
-            if self.player_pos == self.exit_pos:
-                try:
-                    if self.exit_sfx_path and pygame.mixer.get_init():
-                        sfx = pygame.mixer.Sound(self.exit_sfx_path)
-                        vol = 0.7 if self.level <= 2 else 0.9 if self.level <= 6 else 1.0
-                        self.sfx_channel.set_volume(vol)
-                        self.sfx_channel.play(sfx)
-                except Exception as e:
-                    print("Exit sfx fail:", e)
-                self.on_exit_found()
-
-    def perform_move_visibility(self):
-        px, py = self.player_pos
-        now = time.time()
-        r = self.reveal_radius
-        xmin = max(0, px - r)
-        xmax = min(self.grid_w - 1, px + r)
-        ymin = max(0, py - r)
-        ymax = min(self.grid_h - 1, py + r)
-        for y in range(ymin, ymax + 1):
-            for x in range(xmin, xmax + 1):
-                if self.grid[y][x] == 0 and manhattan((x, y), (px, py)) <= r:
-                    self.visible_ts[(x, y)] = now
-
-    def is_visible(self, tx, ty):
-        now = time.time()
-        if (tx, ty) == self.player_pos:
-            return True
-        ts = self.visible_ts.get((tx, ty))
-        if ts is not None and (now - ts) <= GLOW_DURATION:
-            return True
-        return False
+        if self.scene != SCENE_PLAY:
+            return  # the finished level takes no more moves
+        event = self.state.try_move(dx, dy)
+        if event in (EVENT_EXIT, EVENT_BEACON):
+            try:
+                if self.exit_sfx:
+                    vol = 0.7 if self.state.level <= 2 else 0.9 if self.state.level <= 6 else 1.0
+                    self.sfx_channel.set_volume(vol)
+                    self.sfx_channel.play(self.exit_sfx)
+            except Exception as e:
+                print("Exit sfx fail:", e)
+        self.update_view()
+        if event != EVENT_BLOCKED:
+            self.sync_minimap_glow()
+        if event == EVENT_EXIT:
+            self.on_exit_found()
 
     def trigger_hint(self):
-        now = time.time()
-        self.pinger_active_until = now + PINGER_SHOW_SEC
-        self.hint_count += 1
+        if self.scene != SCENE_PLAY:
+            return
+        self.state.trigger_hint()
         try:
-            if self.hint_sfx_path and pygame.mixer.get_init():
-                sfx = pygame.mixer.Sound(self.hint_sfx_path)
-                vol = 0.26 if self.level <= 2 else 0.5 if self.level <= 6 else 0.8
+            if self.hint_sfx:
+                vol = 0.26 if self.state.level <= 2 else 0.5 if self.state.level <= 6 else 0.8
                 self.sfx_channel.set_volume(vol)
-                self.sfx_channel.play(sfx)
+                self.sfx_channel.play(self.hint_sfx)
         except Exception as e:
             print("Hint play fail:", e)
 
+    # ---------- level-complete scene ----------
+    # Reaching the exit switches to SCENE_CLEARED: the summary box shows for
+    # CLEARED_OVERLAY_SEC while the main loop keeps handling input, audio and drawing, and
+    # the next level is built in the background. Return/Space closes the box early.
     def on_exit_found(self):
-        now = time.time()
-        level_elapsed = now - self.start_time
-        hints_used = self.hint_count
-        lvl_key = str(self.level)
-        prev_best = self.records.get(lvl_key, None)
-        new_record = False
-        if prev_best is None or level_elapsed < prev_best:
-            self.records[lvl_key] = level_elapsed
-            self.save_records()
-            new_record = True
-
-        overlay_start = time.time()
-        overlay_duration = 3.0
-        while time.time() - overlay_start < overlay_duration:
-            for e in pygame.event.get():
-                if e.type == pygame.QUIT:
-                    self.running = False
-                    return
-            self.draw()
-            overlay_w = 420
-            overlay_h = 140
-            ox = (self.win_w - overlay_w) // 2
-            oy = (self.win_h - overlay_h) // 2
-            s = pygame.Surface((overlay_w, overlay_h), pygame.SRCALPHA)
-            s.fill((8, 8, 10, 220))
-            title = f"Level {self.level} cleared!"
-            line1 = f"Hints used: {hints_used}"
-            line2 = f"Time: {int(level_elapsed)}s"
-            if prev_best is None:
-                prev_display = "—"
-            else:
-                prev_display = f"{int(prev_best)}s"
-            if new_record:
-                note = f"New personal best! ({int(level_elapsed)}s)"
-            else:
-                note = f"Personal fastest: {prev_display}"
-            self.screen.blit(s, (ox, oy))
-            self.draw_text(title, ox + 18, oy + 12, self.bigfont, COLOR_TEXT)
-            self.draw_text(line1, ox + 18, oy + 44, self.font, COLOR_STATS)
-            self.draw_text(line2, ox + 18, oy + 64, self.font, COLOR_STATS)
-            if new_record:
-                self.draw_text(note, ox + 18, oy + 88, self.font, COLOR_RECORD_HIGHLIGHT)
-            else:
-                self.draw_text(note, ox + 18, oy + 88, self.font, COLOR_STATS)
-            pygame.display.flip()
-            self.clock.tick(30)
-
-        self.level = min(10, self.level + 1)
-        self.generate_for_level(self.level)
-        pygame.display.set_caption(f"Maze Dungeon — Level {self.level}")
+        run = self.state.complete_level()
+        # rank against earlier runs first; record() hands the write to the journal thread
+        percentile = self.journal.percentile(run["level"], run["time"])
+        earlier_runs = self.journal.count(run["level"])
+        prev_best = self.journal.best(run["level"])
+        new_record = prev_best is None or run["time"] < prev_best
+        self.scene = SCENE_CLEARED
+        self.cleared = {"run": run, "prev_best": prev_best, "new_record": new_record,
+                        "percentile": percentile, "earlier_runs": earlier_runs,
+                        "until": time.time() + CLEARED_OVERLAY_SEC}
+        if self.replay is not None:
+            # a replayed run is only compared with the records; the recording starts the next level
+            self.request_full_redraw()
+            return
+        self.journal.record(run)
+        next_level = min(MAX_LEVEL, self.state.level + 1)
+        job = self.prefetcher.take_next(next_level, self.state)
+        if job is None:
+            job = self.prefetcher.submit(next_level, self.state.choose_seed(next_level))
+        self.next_level_job = (next_level, job)
+        self.request_full_redraw()
+
+    def update_scene(self, now):
+        if self.scene != SCENE_CLEARED or now < self.cleared["until"] or self.replay is not None:
+            return
+        level, job = self.next_level_job
+        if job is not None and not job.done():
+            return  # hand off the moment the level is ready (no job: built here)
+        self.scene = SCENE_PLAY
+        self.cleared = None
+        self.next_level_job = None
+        self.generate_for_level(level, prepared_level(job))
+        pygame.display.set_caption(self.caption())
+
+    def apply_replay_event(self, event):
+        # one recorded input, through the same paths the keyboard uses
+        _, code, level, seed = event
+        if code == CODE_LEVEL:
+            self.scene = SCENE_PLAY
+            self.cleared = None
+            self.generate_for_level(level, seed=seed)
+            pygame.display.set_caption(self.caption())
+        elif code == ACTION_HINT:
+            self.trigger_hint()
+        elif code < len(ACTION_DELTAS):
+            self.try_move(*ACTION_DELTAS[code])
+
+    def skip_cleared_overlay(self):
+        if self.scene == SCENE_CLEARED:
+            self.cleared["until"] = 0.0
+
+    def cleared_overlay_rect(self):
+        overlay_w = 420
+        overlay_h = 160
+        return pygame.Rect((self.win_w - overlay_w) // 2, (self.win_h - overlay_h) // 2, overlay_w, overlay_h)
+
+    def draw_cleared_overlay(self, rect):
+        run = self.cleared["run"]
+        prev_best = self.cleared["prev_best"]
+        new_record = self.cleared["new_record"]
+        level_elapsed = run["time"]
+        ox, oy = rect.topleft
+        if self.cleared_surface is None or self.cleared_surface.get_size() != rect.size:
+            self.cleared_surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+            PROFILER.count("surface_alloc")
+            self.cleared_surface.fill((8, 8, 10, 220))
+        title = f"Level {run['level']} cleared!"
+        line1 = f"Hints used: {run['hints']}"
+        line2 = f"Time: {int(level_elapsed)}s   Moves: {run['moves']} (shortest {run['shortest']})"
+        if prev_best is None:
+            prev_display = "—"
+        else:
+            prev_display = f"{int(prev_best)}s"
+        if new_record:
+            note = f"New personal best! ({int(level_elapsed)}s)"
+        else:
+            note = f"Personal fastest: {prev_display}"
+        self.screen.blit(self.cleared_surface, (ox, oy))
+        PROFILER.count("draw_calls")
+        self.draw_text(title, ox + 18, oy + 12, self.bigfont, COLOR_TEXT)
+        self.draw_text(line1, ox + 18, oy + 44, self.font, COLOR_STATS)
+        self.draw_text(line2, ox + 18, oy + 64, self.font, COLOR_STATS)
+        if new_record:
+            self.draw_text(note, ox + 18, oy + 88, self.font, COLOR_RECORD_HIGHLIGHT)
+        else:
+            self.draw_text(note, ox + 18, oy + 88, self.font, COLOR_STATS)
+        if self.cleared["earlier_runs"]:
+            line3 = f"At least as fast as {self.cleared['percentile']:.0f}% of {self.cleared['earlier_runs']} earlier runs"
+            self.draw_text(line3, ox + 18, oy + 112, self.font, COLOR_STATS)
 
     def draw_pinger_arrow(self, surface, center_x, center_y, angle_rad, size_px, alpha=255):
         surf = pygame.Surface((size_px*2, size_px*2), pygame.SRCALPHA)
@@ -780,11 +1363,57 @@ class MazeGame:
         col = COLOR_PINGER_ARROW[:3] + (clamp(alpha, 0, 255),)
         pygame.draw.polygon(surf, col, pts)
         rotated = pygame.transform.rotate(surf, -math.degrees(angle_rad))
+        PROFILER.count("surface_alloc", 2)
+        PROFILER.count("draw_calls", 2)
         rrect = rotated.get_rect(center=(center_x, center_y - int(self.draw_tile * 0.9)))
-        surface.blit(rotated, rrect.topleft)
-
-    def draw_minimap_at(self, mini_x, mini_y, mini_w, mini_h, px, py, pinger_remaining):
+        return surface.blit(rotated, rrect.topleft)
+
+    # ---------- minimap cache ----------
+    # The minimap is a native one-pixel-per-tile RGB surface whose pixels live in a
+    # bytearray (pygame.image.frombuffer shares the memory). Walls/floor are translated in
+    # once per level (per scroll step in endless mode); glowing tiles are then painted in
+    # and out one pixel at a time as they light up and expire. The scaled copy is only
+    # rebuilt when a pixel changed, so frame cost does not grow with the maze.
+    def build_minimap_base(self):
+        vx0, vy0 = self.view_x0, self.view_y0
+        tiles = self.state.grid.window(vx0, vy0, self.grid_w, self.grid_h)
+        pixels = bytearray(len(tiles) * 3)
+        for c, table in enumerate(MINIMAP_CHANNELS):
+            pixels[c::3] = tiles.translate(table)
+        self.mini_pixels = pixels
+        self.mini_native = pygame.image.frombuffer(pixels, (self.grid_w, self.grid_h), "RGB")
+        PROFILER.count("surface_alloc")
+        self.mini_origin = (vx0, vy0)
+        for x, y in self.mini_glow:
+            self.paint_minimap_tile(x, y, COLOR_MINIMAP_FLOOR_VISIBLE)
+        self.mini_dirty = True
+
+    def paint_minimap_tile(self, x, y, color):
+        lx, ly = x - self.mini_origin[0], y - self.mini_origin[1]
+        if 0 <= lx < self.grid_w and 0 <= ly < self.grid_h:
+            i = (ly * self.grid_w + lx) * 3
+            self.mini_pixels[i:i + 3] = bytes(color)
+            self.mini_dirty = True
+
+    def sync_minimap_glow(self):
+        # after a move: light the tiles the player can see now
+        if self.mini_native is None or self.mini_origin != (self.view_x0, self.view_y0):
+            self.build_minimap_base()
+        lit_at = self.state.last_lit_at
+        for x, y in self.state.last_lit:
+            if (x, y) not in self.mini_glow:
+                self.paint_minimap_tile(x, y, COLOR_MINIMAP_FLOOR_VISIBLE)
+            self.mini_glow[(x, y)] = lit_at
+
+    def expire_minimap_glow(self, now):
+        expired = [p for p, t in self.mini_glow.items() if now - t > GLOW_DURATION]
+        for x, y in expired:
+            del self.mini_glow[(x, y)]
+            self.paint_minimap_tile(x, y, COLOR_MINIMAP_FLOOR_HIDDEN)
+
+    def draw_minimap_at(self, mini_x, mini_y, mini_w, mini_h, px, py, pinger_remaining, route=()):
         """Helper: draw minimap at given coords onto self.screen"""
+        t0 = time.perf_counter()
         mini_rect = pygame.Rect(mini_x, mini_y, mini_w, mini_h)
         pygame.draw.rect(self.screen, (12,12,15), mini_rect, border_radius=6)
         if self.grid_w and self.grid_h:
@@ -793,170 +1422,170 @@ class MazeGame:
             scale = min(cell_w, cell_h)
             offset_x = mini_x + (mini_w - scale * self.grid_w) / 2
             offset_y = mini_y + (mini_h - scale * self.grid_h) / 2
-            for y in range(self.grid_h):
-                for x in range(self.grid_w):
-                    color = COLOR_MINIMAP_WALL if self.grid[y][x] == 1 else (COLOR_MINIMAP_FLOOR_VISIBLE if self.is_visible(x,y) else COLOR_MINIMAP_FLOOR_HIDDEN)
-                    r = pygame.Rect(offset_x + x*scale, offset_y + y*scale, scale, scale)
-                    pygame.draw.rect(self.screen, color, r)
+            vx0, vy0 = self.view_x0, self.view_y0
+            if self.mini_native is None or self.mini_origin != (vx0, vy0):
+                self.build_minimap_base()
+            size = (max(1, int(scale * self.grid_w)), max(1, int(scale * self.grid_h)))
+            if self.mini_dirty or self.mini_scaled is None or self.mini_scaled.get_size() != size:
+                self.mini_scaled = pygame.transform.scale(self.mini_native, size).convert()
+                self.mini_dirty = False
+                PROFILER.count("surface_alloc", 2)
+            self.screen.blit(self.mini_scaled, (offset_x, offset_y))
             mini_px = offset_x + px*scale
             mini_py = offset_y + py*scale
             pygame.draw.rect(self.screen, COLOR_MINIMAP_PLAYER, (mini_px, mini_py, scale, scale))
-            # if hint active, draw mini arrow (with alpha fade)
-            if pinger_remaining > 0.0:
-                ex, ey = self.exit_pos
-                dx = ex - px
-                dy = ey - py
-                if dx != 0 or dy != 0:
-                    angle = math.atan2(dy, dx)
-                    line_len = max(6, int(scale * 3))
-                    x1 = mini_px + scale/2
-                    y1 = mini_py + scale/2
-                    x2 = x1 + math.cos(angle)*line_len
-                    y2 = y1 + math.sin(angle)*line_len
-                    alpha = int(255 * (pinger_remaining / PINGER_SHOW_SEC))
-                    tmp = pygame.Surface((mini_w, mini_h), pygame.SRCALPHA)
-                    pygame.draw.line(tmp, (220,80,80, alpha), (x1 - mini_x, y1 - mini_y), (x2 - mini_x, y2 - mini_y), max(1, int(scale/6)))
-                    self.screen.blit(tmp, (mini_x, mini_y))
+            PROFILER.count("draw_calls", 2)
+            # if hint active, draw the route preview (with alpha fade) on a reused layer
+            if pinger_remaining > 0.0 and route:
+                half = scale / 2
+                pts = [(mini_px + half - mini_x, mini_py + half - mini_y)]
+                pts += [(offset_x + (rx - vx0)*scale + half - mini_x, offset_y + (ry - vy0)*scale + half - mini_y) for rx, ry in route]
+                alpha = int(255 * (pinger_remaining / PINGER_SHOW_SEC))
+                tmp = self.mini_route_surface
+                if tmp is None or tmp.get_size() != (mini_w, mini_h):
+                    tmp = self.mini_route_surface = pygame.Surface((mini_w, mini_h), pygame.SRCALPHA).convert_alpha()
+                    PROFILER.count("surface_alloc", 2)
+                tmp.fill((0, 0, 0, 0))
+                pygame.draw.lines(tmp, (220,80,80, alpha), False, pts, max(1, int(scale/3)))
+                self.screen.blit(tmp, (mini_x, mini_y))
+                PROFILER.count("draw_calls", 3)
+        PROFILER.count("draw_calls")
+        PROFILER.add("minimap", time.perf_counter() - t0)
+
+    # ---------- rendering ----------
+    # draw() repaints only what changed since the last frame and returns the screen rects
+    # to push with pygame.display.update(), or None after a full repaint (flip it all).
+    # maze_surface persists between frames: visible tiles are diffed against what is
+    # already on it, and the tiles under last frame's sprites (player, hint arrow, route
+    # dots, debug exit) are restored before the sprites are drawn again. Text and the
+    # floating minimap sit on top of the maze, so they are redrawn when their content
+    # changed or when maze pixels underneath them were repainted.
+    def request_full_redraw(self):
+        self.full_redraw = True
 
     def draw(self):
-        self.screen.fill(WINDOW_BG)
-        if self.maze_surface.get_width() != self.maze_surface_w or self.maze_surface.get_height() != self.maze_surface_h:
-            self.maze_surface = pygame.Surface((self.maze_surface_w, self.maze_surface_h))
-        # default background hides entire maze
-        self.maze_surface.fill(COLOR_HIDDEN)
-
         now = time.time()
-        px, py = self.player_pos
-
-        # Render radius around player for the visible neighborhood (2..4 tiles)
-        render_r = max(2, min(4, self.reveal_radius))
-        xmin = max(0, px - render_r)
-        xmax = min(self.grid_w - 1, px + render_r)
-        ymin = max(0, py - render_r)
-        ymax = min(self.grid_h - 1, py + render_r)
-
-        # draw only the small neighborhood (everywhere else remains hidden/background)
-        for y in range(ymin, ymax + 1):
-            for x in range(xmin, xmax + 1):
-                sx = x * self.draw_tile
-                sy = y * self.draw_tile
-                vis = self.is_visible(x, y)
-                if not vis:
-                    pygame.draw.rect(self.maze_surface, COLOR_HIDDEN, (sx, sy, self.draw_tile, self.draw_tile))
-                    continue
-                if self.grid[y][x] == 1:
-                    pygame.draw.rect(self.maze_surface, COLOR_WALL, (sx, sy, self.draw_tile, self.draw_tile))
-                else:
-                    # use level-specific floor color
-                    pygame.draw.rect(self.maze_surface, self.floor_color, (sx, sy, self.draw_tile, self.draw_tile))
-
-        # draw player as before
-        prx = px * self.draw_tile + int(self.draw_tile * 0.15)
-        pry = py * self.draw_tile + int(self.draw_tile * 0.15)
-        psize = int(self.draw_tile * 0.7)
-        pygame.draw.rect(self.maze_surface, COLOR_PLAYER, (prx, pry, psize, psize))
-
-        # hint arrow (main view) with fade
-        pinger_remaining = max(0.0, self.pinger_active_until - now)
-        if pinger_remaining > 0.0:
-            ex, ey = self.exit_pos
-            dx = ex - px
-            dy = ey - py
-            angle = math.atan2(dy, dx) if (dx != 0 or dy != 0) else 0.0
-            cx = px * self.draw_tile + self.draw_tile // 2
-            cy = py * self.draw_tile + self.draw_tile // 2
-            arrow_size = max(8, self.draw_tile // 2)
-            alpha = int(255 * (pinger_remaining / PINGER_SHOW_SEC))
-            self.draw_pinger_arrow(self.maze_surface, cx, cy, angle, arrow_size, alpha)
-
-        # debug reveal of exit (unchanged)
-        if self.debug_show_exit:
-            ex, ey = self.exit_pos
-            sx = ex * self.draw_tile
-            sy = ey * self.draw_tile
-            pad = max(2, self.draw_tile // 6)
-            pygame.draw.rect(self.maze_surface, (220, 60, 60), (sx + pad, sy + pad, self.draw_tile - pad * 2, self.draw_tile - pad * 2))
-
-        # blit maze_surface
-        left_x = MARGIN
-        left_y = MARGIN
-        self.screen.blit(self.maze_surface, (left_x, left_y))
+        full = self.full_redraw
+        if full:
+            self.full_redraw = False
+            self.update_render_metrics()  # window or level size may have changed
+            self.screen.fill(WINDOW_BG)
+            self.maze_origin = None
+            self.hud_key = None
+            self.top_key = None
+            self.mini_key = None
+            PROFILER.count("draw_calls")
+        self.expire_minimap_glow(now)
+
+        dirty = []
+        t0 = time.perf_counter()
+        pinger_remaining, route = self.draw_maze_view(now, dirty)
+        PROFILER.add("maze", time.perf_counter() - t0)
+        if self.mini_vacated is not None:
+            # the minimap was dragged: uncover where it was (overlays there redraw below)
+            if not full:
+                self.restore_background(self.mini_vacated)
+                dirty.append(self.mini_vacated)
+            self.mini_vacated = None
+            self.mini_key = None
+        maze_dirty = list(dirty)
+        # HUD time excludes the minimap drawn inside it (timed on its own)
+        t0 = time.perf_counter()
+        minimap_before = PROFILER.spent("minimap")
+        vx0, vy0 = self.view_x0, self.view_y0
+        px, py = self.state.player_pos[0] - vx0, self.state.player_pos[1] - vy0
+        mini_key = (px, py, vx0, vy0)
+        mini_changed = self.mini_dirty or mini_key != self.mini_key or pinger_remaining > 0.0 or self.mini_route_shown
+        self.mini_key = mini_key
+        self.mini_route_shown = pinger_remaining > 0.0
 
         # Draw top counter for hints & small info (always visible)
         top_center_x = self.win_w // 2
-        self.draw_text(f"Hints used: {self.hint_count}", top_center_x - 80, 6, self.font, COLOR_TEXT)
+        top_key = self.state.hint_count
+        if top_key != self.top_key or self.top_rect.collidelist(maze_dirty) != -1:
+            self.restore_background(self.top_rect)
+            dirty.append(self.top_rect)
+            self.top_key = top_key
+            self.top_rect = self.draw_text(f"Hints used: {self.state.hint_count}", top_center_x - 80, 6, self.font, COLOR_TEXT)
+            dirty.append(self.top_rect)
 
         # HUD rendering: when not minimized -> full sidebar; when minimized -> only floating movable minimap
+        left_x = MARGIN
+        left_y = MARGIN
         hud_x = left_x + self.maze_surface_w + MARGIN
         hud_rect = pygame.Rect(hud_x, MARGIN, HUD_WIDTH, self.win_h - MARGIN*2)
 
         if not self.hud_minimized:
-            pygame.draw.rect(self.screen, COLOR_HUD_BG, hud_rect, border_radius=6)
             pad = 12
             x_text = hud_x + pad
             y_text = MARGIN + pad
-
-            # Build wrapped HUD lines
-            lines = self.generate_hud_lines(x_text, pad)
-            # compute content height
-            line_heights = []
-            for (txt, font, col) in lines:
-                lh = font.get_linesize() if font != self.bigfont else self.bigfont.get_linesize()
-                line_heights.append(lh)
-            content_h = sum(line_heights)
-            view_h = hud_rect.height - pad*2 - 40  # leaves room at top and bottom
-            max_scroll = max(0, content_h - view_h)
-            # clamp hud_scroll
-            self.hud_scroll = clamp(self.hud_scroll, 0, max_scroll)
-
-            # draw content into viewport with scroll offset
-            draw_x = x_text
-            draw_y = y_text - int(self.hud_scroll)
-            cursor = 0
-            for idx, (txt, font, col) in enumerate(lines):
-                lh = line_heights[idx]
-                # only render lines that intersect view rect
-                if draw_y + lh >= hud_rect.y + pad and draw_y <= hud_rect.y + hud_rect.height - pad - 30:
-                    surf = font.render(str(txt), True, col)
-                    self.screen.blit(surf, (draw_x, draw_y))
-                draw_y += lh
-                cursor += 1
-
-            # Buttons: HINT and MINIMIZE (positioned near bottom)
             btn_w = 120
             btn_h = 28
             btn_x = x_text
             btn_y = self.win_h - MARGIN - pad - btn_h - 30
-            self.hint_button_rect = pygame.Rect(btn_x, btn_y, btn_w, btn_h)
-            pygame.draw.rect(self.screen, COLOR_BUTTON, self.hint_button_rect, border_radius=6)
-            self.draw_text("HINT", btn_x + 36, btn_y + 6, self.font, COLOR_BUTTON_TEXT)
-            # Minimize button
-            min_x = btn_x + btn_w + 12
-            self.minimize_button_rect = pygame.Rect(min_x, btn_y, 28, btn_h)
-            pygame.draw.rect(self.screen, COLOR_BUTTON, self.minimize_button_rect, border_radius=6)
-            self.draw_text("-", min_x + 8, btn_y + 6, self.font, COLOR_BUTTON_TEXT)
-
-            # draw minimap at bottom (since HUD visible) - not draggable in full HUD mode
             mini_w = HUD_WIDTH - pad*2
             mini_h = 160
             mini_x = x_text
             mini_y = btn_y - 14 - mini_h
-            self.draw_minimap_at(mini_x, mini_y, mini_w, mini_h, px, py, pinger_remaining)
-
-            # draw scrollbar at right side of HUD content
-            scroll_x = hud_rect.right - 12
-            track_y = hud_rect.y + pad + 8
-            track_h = view_h
-            track_rect = pygame.Rect(scroll_x, track_y, 8, track_h)
-            pygame.draw.rect(self.screen, COLOR_SCROLL_TRACK, track_rect, border_radius=4)
-            if content_h > 0 and max_scroll > 0:
-                thumb_h = max(20, int(view_h * (view_h / content_h)))
-                thumb_y = track_y + int((self.hud_scroll / max_scroll) * (track_h - thumb_h))
-                thumb_rect = pygame.Rect(track_rect.x, thumb_y, track_rect.width, thumb_h)
-                pygame.draw.rect(self.screen, COLOR_SCROLL_THUMB, thumb_rect, border_radius=4)
-            else:
-                thumb_rect = pygame.Rect(track_rect.x, track_rect.y, track_rect.width, track_rect.height)
-                pygame.draw.rect(self.screen, COLOR_SCROLL_THUMB, thumb_rect, border_radius=4)
+            st = self.state
+            hud_key = (int(st.elapsed()), st.moves, st.level, st.beacons_found, st.reveal_radius, st.seed_used,
+                       self.hud_scroll, hud_rect.size)
+            if hud_key != self.hud_key:
+                self.hud_key = hud_key
+                mini_changed = True
+                self.screen.fill(WINDOW_BG, hud_rect)
+                pygame.draw.rect(self.screen, COLOR_HUD_BG, hud_rect, border_radius=6)
+                dirty.append(hud_rect)
+
+                # Build wrapped HUD lines
+                lines = self.generate_hud_lines(x_text, pad)
+                content_h = self.hud_layout(pad)[1]
+                view_h = hud_rect.height - pad*2 - 40  # leaves room at top and bottom
+                max_scroll = max(0, content_h - view_h)
+                # clamp hud_scroll
+                self.hud_scroll = clamp(self.hud_scroll, 0, max_scroll)
+
+                # draw content into viewport with scroll offset
+                draw_x = x_text
+                draw_y = y_text - int(self.hud_scroll)
+                for (txt, font, col) in lines:
+                    lh = font.get_linesize()
+                    # only render lines that intersect view rect
+                    if draw_y + lh >= hud_rect.y + pad and draw_y <= hud_rect.y + hud_rect.height - pad - 30:
+                        self.screen.blit(self.text_cache.render(str(txt), font, col), (draw_x, draw_y))
+                        PROFILER.count("draw_calls")
+                    draw_y += lh
+
+                # Buttons: HINT and MINIMIZE (positioned near bottom)
+                self.hint_button_rect = pygame.Rect(btn_x, btn_y, btn_w, btn_h)
+                pygame.draw.rect(self.screen, COLOR_BUTTON, self.hint_button_rect, border_radius=6)
+                self.draw_text("HINT", btn_x + 36, btn_y + 6, self.font, COLOR_BUTTON_TEXT)
+                # Minimize button
+                min_x = btn_x + btn_w + 12
+                self.minimize_button_rect = pygame.Rect(min_x, btn_y, 28, btn_h)
+                pygame.draw.rect(self.screen, COLOR_BUTTON, self.minimize_button_rect, border_radius=6)
+                self.draw_text("-", min_x + 8, btn_y + 6, self.font, COLOR_BUTTON_TEXT)
+
+                # draw scrollbar at right side of HUD content
+                scroll_x = hud_rect.right - 12
+                track_y = hud_rect.y + pad + 8
+                track_h = view_h
+                track_rect = pygame.Rect(scroll_x, track_y, 8, track_h)
+                pygame.draw.rect(self.screen, COLOR_SCROLL_TRACK, track_rect, border_radius=4)
+                if content_h > 0 and max_scroll > 0:
+                    thumb_h = max(20, int(view_h * (view_h / content_h)))
+                    thumb_y = track_y + int((self.hud_scroll / max_scroll) * (track_h - thumb_h))
+                    thumb_rect = pygame.Rect(track_rect.x, thumb_y, track_rect.width, thumb_h)
+                    pygame.draw.rect(self.screen, COLOR_SCROLL_THUMB, thumb_rect, border_radius=4)
+                else:
+                    thumb_rect = pygame.Rect(track_rect.x, track_rect.y, track_rect.width, track_rect.height)
+                    pygame.draw.rect(self.screen, COLOR_SCROLL_THUMB, thumb_rect, border_radius=4)
+                PROFILER.count("draw_calls", 6)  # panel fill and frame, two buttons, scrollbar track and thumb
+
+            # draw minimap at bottom (since HUD visible) - not draggable in full HUD mode
+            if mini_changed:
+                self.draw_minimap_at(mini_x, mini_y, mini_w, mini_h, px, py, pinger_remaining, route)
+                dirty.append(pygame.Rect(mini_x, mini_y, mini_w, mini_h))
 
         else:
             # HUD fully hidden: show only floating minimap (draggable), no other sidebar UI.
@@ -969,39 +1598,295 @@ class MazeGame:
                 self.mini_pos = (default_x, default_y)
 
             mini_x, mini_y = self.mini_pos
-            # draw a thin outline to indicate draggable widget
             outline_rect = pygame.Rect(mini_x-4, mini_y-4, self.mini_w+8, self.mini_h+8)
-            pygame.draw.rect(self.screen, (40,160,40), outline_rect, width=2, border_radius=6)
-            # draw minimap contents
-            self.draw_minimap_at(mini_x, mini_y, self.mini_w, self.mini_h, px, py, pinger_remaining)
+            if mini_changed or outline_rect.collidelist(maze_dirty) != -1:
+                self.restore_background(outline_rect)
+                # draw a thin outline to indicate draggable widget
+                pygame.draw.rect(self.screen, (40,160,40), outline_rect, width=2, border_radius=6)
+                # draw minimap contents
+                self.draw_minimap_at(mini_x, mini_y, self.mini_w, self.mini_h, px, py, pinger_remaining, route)
+                dirty.append(outline_rect)
 
             # small reminder text to restore HUD
-            self.draw_text("[HUD hidden — press M to restore]", self.win_w - 260, 8, self.font, (140,140,140))
+            if full or self.reminder_rect.collidelist(maze_dirty) != -1:
+                self.restore_background(self.reminder_rect)
+                self.reminder_rect = self.draw_text("[HUD hidden — press M to restore]", self.win_w - 260, 8, self.font, (140,140,140))
+                dirty.append(self.reminder_rect)
 
             # ensure button rects are None to avoid accidental clicks
             self.hint_button_rect = None
             self.minimize_button_rect = None
+        PROFILER.add("hud", time.perf_counter() - t0 - (PROFILER.spent("minimap") - minimap_before))
+
+        # frame profiler (F3): refreshed on a timer, or when maze pixels under it changed
+        if self.profile_overlay and (full or now >= self.profile_next or self.profile_rect.collidelist(maze_dirty) != -1):
+            self.restore_background(self.profile_rect)
+            dirty.append(self.profile_rect)
+            self.profile_rect = self.draw_profile_overlay(MARGIN + 8, MARGIN + 8)
+            dirty.append(self.profile_rect)
+            self.profile_next = now + PROFILE_OVERLAY_SEC
+
+        # level-complete box: translucent, so anything repainted under it means a fresh frame
+        if self.scene == SCENE_CLEARED:
+            box = self.cleared_overlay_rect()
+            if not full and box.collidelist(dirty) != -1:
+                self.request_full_redraw()
+                return self.draw()
+            if full:
+                self.draw_cleared_overlay(box)
+
+        return None if full else dirty
+
+    def restore_background(self, rect):
+        # repaint whatever lies under an overlay: window background plus any maze pixels
+        self.screen.fill(WINDOW_BG, rect)
+        PROFILER.count("draw_calls")
+        maze_rect = pygame.Rect(MARGIN, MARGIN, self.maze_surface_w, self.maze_surface_h)
+        clip = rect.clip(maze_rect)
+        if clip.width and clip.height:
+            self.screen.blit(self.maze_surface, clip.topleft, clip.move(-MARGIN, -MARGIN))
+            PROFILER.count("draw_calls")
+
+    def draw_profile_overlay(self, x, y):
+        # rolling percentiles per phase plus last frame's counters; returns the box rect
+        font = self.smallfont
+        lh = font.get_linesize()
+        counts = PROFILER.last_counts
+        lines = [f"{'ms':<8}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for phase, p50, p95, p99 in PROFILER.summary():
+            lines.append(f"{phase:<8}{p50 * 1000:7.2f}{p95 * 1000:7.2f}{p99 * 1000:7.2f}")
+        lines.append(f"draws {counts.get('draw_calls', 0)}  text {counts.get('font_render', 0)}"
+                     f"  surf {counts.get('surface_alloc', 0)}")
+        lines.append(f"frames {PROFILER.frames}")
+        rect = pygame.Rect(x, y, max(font.size(l)[0] for l in lines) + 12, len(lines) * lh + 8)
+        self.screen.fill(COLOR_HUD_BG, rect)
+        for i, line in enumerate(lines):
+            self.draw_text(line, x + 6, y + 4 + i * lh, font, COLOR_STATS)
+        return rect
+
+    def draw_maze_view(self, now, dirty):
+        # repaint changed tiles on maze_surface, blit them to the screen and add their rects
+        # to `dirty`; returns (pinger_remaining, route) for the minimap
+        tile = self.draw_tile
+        vx0, vy0 = self.view_x0, self.view_y0
+        wpx, wpy = self.state.player_pos
+        px, py = wpx - vx0, wpy - vy0
+        whole = self.maze_origin != (vx0, vy0)  # first frame, or the endless view scrolled
+        if whole:
+            self.maze_origin = (vx0, vy0)
+            self.maze_surface.fill(COLOR_HIDDEN)
+            self.maze_painted = {}
+            self.sprite_tiles = set()
 
-        # end draw
+        # Render radius around player for the visible neighborhood (2..4 tiles)
+        render_r = max(2, min(4, self.state.reveal_radius))
+        xmin = max(vx0, wpx - render_r)
+        xmax = min(vx0 + self.grid_w - 1, wpx + render_r)
+        ymin = max(vy0, wpy - render_r)
+        ymax = min(vy0 + self.grid_h - 1, wpy + render_r)
+
+        # only the small neighbourhood is ever lit (everywhere else remains hidden/background);
+        # use level-specific floor color
+        painted = {}
+        for y in range(ymin, ymax + 1):
+            for x in range(xmin, xmax + 1):
+                if self.state.is_visible(x, y, now):
+                    painted[(x, y)] = COLOR_WALL if self.state.grid.get(x, y) == 1 else self.floor_color
+        old = self.maze_painted
+        changed = {t for t, col in painted.items() if old.get(t) != col}
+        changed.update(t for t in old if t not in painted)
+        self.maze_painted = painted
+
+        # sprites are redrawn when they move or animate, or when tiles under them changed
+        pinger_remaining = self.state.pinger_remaining(now)
+        sprite_key = (wpx, wpy, self.debug_show_exit, self.state.exit_pos, pinger_remaining > 0.0)
+        redraw_sprites = (whole or pinger_remaining > 0.0 or sprite_key != self.sprite_key
+                          or not changed.isdisjoint(self.sprite_tiles))
+        self.sprite_key = sprite_key
+        if redraw_sprites:
+            changed |= self.sprite_tiles
+        for x, y in changed:
+            pygame.draw.rect(self.maze_surface, painted.get((x, y), COLOR_HIDDEN), ((x - vx0) * tile, (y - vy0) * tile, tile, tile))
+        if not redraw_sprites:
+            for x, y in changed:
+                area = pygame.Rect((x - vx0) * tile, (y - vy0) * tile, tile, tile)
+                dirty.append(self.screen.blit(self.maze_surface, (MARGIN + area.x, MARGIN + area.y), area))
+            PROFILER.count("draw_calls", 2 * len(changed))
+            return pinger_remaining, ()
+
+        sprites = []
+        # draw player as before
+        prx = px * tile + int(tile * 0.15)
+        pry = py * tile + int(tile * 0.15)
+        psize = int(tile * 0.7)
+        sprites.append(pygame.draw.rect(self.maze_surface, COLOR_PLAYER, (prx, pry, psize, psize)))
+
+        # hint (main view) with fade: arrow along the next step of the real route, plus a
+        # preview of the route; both are table lookups, no per-frame search
+        route = ()
+        if pinger_remaining > 0.0:
+            route = self.state.hint_route()
+            step = self.state.next_hint_step()
+            if step is not None:
+                dx, dy = ACTION_DELTAS[step]
+            else:
+                dx, dy = self.state.exit_pos[0] - wpx, self.state.exit_pos[1] - wpy
+            angle = math.atan2(dy, dx) if (dx != 0 or dy != 0) else 0.0
+            half = tile // 2
+            dot = max(2, tile // 6)
+            fade = pinger_remaining / PINGER_SHOW_SEC
+            dot_col = tuple(int(c * fade + h * (1 - fade)) for c, h in zip(COLOR_HINT_FLASH, COLOR_HIDDEN))
+            for rx, ry in route:
+                lx, ly = rx - vx0, ry - vy0
+                if 0 <= lx < self.grid_w and 0 <= ly < self.grid_h:
+                    sprites.append(pygame.draw.circle(self.maze_surface, dot_col, (lx * tile + half, ly * tile + half), dot))
+            cx = px * tile + half
+            cy = py * tile + half
+            arrow_size = max(8, tile // 2)
+            alpha = int(255 * fade)
+            sprites.append(self.draw_pinger_arrow(self.maze_surface, cx, cy, angle, arrow_size, alpha))
+
+        # debug reveal of exit (unchanged)
+        if self.debug_show_exit:
+            ex, ey = self.state.exit_pos
+            sx = (ex - vx0) * tile
+            sy = (ey - vy0) * tile
+            pad = max(2, tile // 6)
+            sprites.append(pygame.draw.rect(self.maze_surface, (220, 60, 60), (sx + pad, sy + pad, tile - pad * 2, tile - pad * 2)))
+
+        # tiles under this frame's sprites get restored next frame
+        sprite_tiles = set()
+        for r in sprites:
+            for ty in range(max(0, r.top // tile), min(self.grid_h, (r.bottom - 1) // tile + 1)):
+                for tx in range(max(0, r.left // tile), min(self.grid_w, (r.right - 1) // tile + 1)):
+                    sprite_tiles.add((tx + vx0, ty + vy0))
+        self.sprite_tiles = sprite_tiles
+
+        # blit maze_surface (only the tiles that changed)
+        blits = changed | sprite_tiles
+        if whole:
+            dirty.append(self.screen.blit(self.maze_surface, (MARGIN, MARGIN)))
+        else:
+            for x, y in blits:
+                area = pygame.Rect((x - vx0) * tile, (y - vy0) * tile, tile, tile)
+                dirty.append(self.screen.blit(self.maze_surface, (MARGIN + area.x, MARGIN + area.y), area))
+        PROFILER.count("draw_calls", len(changed) + len(sprites) + (1 if whole else len(blits)))
+        return pinger_remaining, route
 
     def draw_text(self, text, x, y, font, color):
-        surf = font.render(str(text), True, color)
-        self.screen.blit(surf, (x, y))
+        PROFILER.count("draw_calls")
+        return self.screen.blit(self.text_cache.render(str(text), font, color), (x, y))
+
+    # ---------- scheduling ----------
+    # Between inputs the picture only changes when the HUD timer ticks over, when glow
+    # expires and while the hint fades. run() sleeps in pygame.event.wait until the
+    # earliest of those deadlines and runs at FPS only while the hint animates.
+    def next_wake(self, now):
+        # seconds until the picture changes by itself; None = nothing changes until input
+        if self.full_redraw or self.state.pinger_remaining(now) > 0.0:
+            return 0.0
+        deadlines = []
+        if not self.hud_minimized:
+            elapsed = now - self.state.start_time
+            deadlines.append(math.floor(elapsed) + 1 - elapsed)
+        if self.mini_glow:
+            # expiry is strictly after GLOW_DURATION, so aim just past it
+            deadlines.append(min(self.mini_glow.values()) + GLOW_DURATION + 0.001 - now)
+        if self.audio_job is not None:
+            deadlines.append(AUDIO_POLL_SEC)
+        if self.replay is not None and not self.replay.finished():
+            deadlines.append(self.replay.next_time() - now)
+        if self.profile_overlay:
+            deadlines.append(self.profile_next - now)
+        if self.scene == SCENE_CLEARED:
+            # overlay closes at `until`, or as soon as the next level is ready after that
+            remaining = self.cleared["until"] - now
+            deadlines.append(remaining if remaining > 0 else AUDIO_POLL_SEC)
+        return max(0.0, min(deadlines)) if deadlines else None
+
+    def wait_for_events(self):
+        timeout = self.next_wake(time.time())
+        if timeout is not None and timeout <= 1.0 / FPS:
+            self.clock.tick(FPS)  # animating: full rate
+            return pygame.event.get()
+        event = pygame.event.wait() if timeout is None else pygame.event.wait(int(timeout * 1000) + 1)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+        return events
 
     def run(self):
         try:
             while self.running:
-                dt = self.clock.tick(FPS)
-                self.handle_input()
-                self.draw()
-                pygame.display.flip()
+                events = self.wait_for_events()
+                PROFILER.begin_frame()
+                t0 = time.perf_counter()
+                self.handle_input(events)
+                PROFILER.add("input", time.perf_counter() - t0)
+                self.poll_audio()
+                if self.replay is not None:
+                    self.replay.advance_to(time.time(), self.apply_replay_event)
+                self.update_scene(time.time())
+                dirty = self.draw()
+                t0 = time.perf_counter()
+                if dirty is None:
+                    pygame.display.flip()
+                elif dirty:
+                    pygame.display.update(dirty)
+                PROFILER.add("flip", time.perf_counter() - t0)
+                PROFILER.end_frame(level=self.state.level, dirty=-1 if dirty is None else len(dirty))
+                if not self.first_frame_shown:
+                    self.on_first_frame()
         finally:
-            cleanup_temp_sounds()
+            self.prefetcher.cancel()
+            if self.workers is not None:
+                self.workers.shutdown(wait=False, cancel_futures=True)
+            self.journal.close()
+            if self.recorder is not None:
+                self.recorder.close()
+            PROFILER.close()
+            if self.pack is not None:
+                self.pack.close()
             pygame.quit()
 
 # ---------- main ----------
-def main():
-    game = MazeGame(level=1)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maze Dungeon")
+    parser.add_argument("--level", type=int, default=1, help="starting level (1-10)")
+    parser.add_argument("--seed", type=int, default=None, help="fixed maze seed")
+    parser.add_argument("--endless", action="store_true", help="endless chunked world")
+    parser.add_argument("--replay", metavar="PATH", default=None, help="watch a recorded session (.mzr)")
+    parser.add_argument("--no-record", action="store_true", help="do not record this session's inputs")
+    parser.add_argument("--profile", metavar="PATH", default=None,
+                        help="write per-frame timings and tracemalloc snapshots as JSONL")
+    parser.add_argument("--pack", metavar="PATH", default=None, help="play levels from a level pack (see maze_pack.py)")
+    parser.add_argument("--seeds", metavar="PATH", default=None,
+                        help="draw random seeds from a seed table (see maze_difficulty.py)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        PROFILER.start_export(args.profile)
+    replay = None
+    if args.replay:
+        try:
+            replay = load_replay(args.replay)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read replay: {e}")
+    pack = None
+    if args.pack:
+        try:
+            pack = LevelPack(args.pack)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot open level pack: {e}")
+        if pack.generator != GENERATOR_VERSION:
+            parser.error(f"level pack was built with maze generator version {pack.generator}, this is version "
+                         f"{GENERATOR_VERSION}: replays of it would differ (rebuild it with maze_pack.py)")
+    seed_table = None
+    if args.seeds:
+        try:
+            seed_table = load_seed_table(args.seeds)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"cannot read seed table: {e}")
+    game = MazeGame(level=args.level, fixed_seed=args.seed, endless=args.endless,
+                    replay=replay, record=not args.no_record, pack=pack, seed_table=seed_table)
     game.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,214 @@
+"""
+maze_bench.py
+Microbenchmarks for maze generation, level setup and visibility (no display needed).
+- Every LEVEL_MAP size plus synthetic large sizes, all with fixed seeds
+- Reports ops/sec and peak traced memory per case
+- --save writes a JSON baseline, --compare flags regressions beyond --threshold
+
+    python maze_bench.py --save bench_baseline.json
+    python maze_bench.py --compare bench_baseline.json --threshold 0.15
+"""
+
+import argparse
+import fnmatch
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from maze_core import (
+    MazeState, LEVEL_MAP, generate_maze, find_open_positions, add_extra_walls,
+)
+
+BENCH_SEED = 12345
+SYNTHETIC_SIZES = [(301, 301), (1001, 1001)]
+MIN_TIME = 0.2  # seconds each timing round runs for
+ROUNDS = 3      # best round is reported
+
+# ---------- cases ----------
+# A case is (name, setup) where setup() returns the zero-argument callable being timed.
+def _frozen_clock():
+    # visibility work is the same at any time; a constant clock keeps runs comparable
+    return 1000.0
+
+def _state(level):
+    return MazeState(level=level, fixed_seed=BENCH_SEED, clock=_frozen_clock)
+
+def _walk_cycle(state):
+    # a back-and-forth path of open moves from the start, so each call really moves
+    px, py = state.player_pos
+    for dx, dy in ((1, 0), (0, 1), (-1, 0), (0, -1)):
+        if state.grid.is_open(px + dx, py + dy):
+            return [(px + dx, py + dy), (px, py)]
+    return [(px, py)]
+
+def case_generate(w, h):
+    def setup():
+        return lambda: generate_maze(w, h, seed=BENCH_SEED)
+    return setup
+
+def case_find_open(w, h):
+    def setup():
+        grid = generate_maze(w, h, seed=BENCH_SEED)
+        return lambda: find_open_positions(grid)
+    return setup
+
+def case_extra_walls(w, h):
+    def setup():
+        base = generate_maze(w, h, seed=BENCH_SEED)
+        def run():
+            add_extra_walls(base.copy(), 0.1, random.Random(BENCH_SEED), base.index(1, 1))
+        return run
+    return setup
+
+def case_generate_for_level(level):
+    def setup():
+        state = _state(level)
+        return lambda: state.generate_for_level(level)
+    return setup
+
+def case_update_visibility(level):
+    def setup():
+        state = _state(level)
+        path = _walk_cycle(state)
+        n = len(path)
+        step = [0]
+        def run():
+            state.player_pos = path[step[0] % n]
+            step[0] += 1
+            state.update_visibility()
+        return run
+    return setup
+
+def case_is_visible(level):
+    def setup():
+        state = _state(level)
+        px, py = state.player_pos
+        r = state.reveal_radius + 1
+        cells = [(x, y) for y in range(py - r, py + r + 1) for x in range(px - r, px + r + 1)]
+        def run():
+            for x, y in cells:
+                state.is_visible(x, y)
+        return run
+    return setup
+
+def build_cases(quick=False):
+    cases = []
+    levels = sorted(LEVEL_MAP)
+    if quick:
+        levels = [levels[0], levels[len(levels) // 2], levels[-1]]
+    for level in levels:
+        w, h = LEVEL_MAP[level]
+        cases.append((f"generate_maze/L{level}", case_generate(w, h)))
+        cases.append((f"find_open_positions/L{level}", case_find_open(w, h)))
+        cases.append((f"generate_for_level/L{level}", case_generate_for_level(level)))
+        cases.append((f"update_visibility/L{level}", case_update_visibility(level)))
+        cases.append((f"is_visible/L{level}", case_is_visible(level)))
+    for w, h in ([] if quick else SYNTHETIC_SIZES):
+        cases.append((f"generate_maze/{w}x{h}", case_generate(w, h)))
+        cases.append((f"find_open_positions/{w}x{h}", case_find_open(w, h)))
+        cases.append((f"add_extra_walls/{w}x{h}", case_extra_walls(w, h)))
+    return cases
+
+# ---------- measurement ----------
+def time_case(fn, min_time=MIN_TIME, rounds=ROUNDS):
+    # calibrate a batch size that runs for about min_time, then keep the best of `rounds`
+    batch = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        dt = time.perf_counter() - t0
+        if dt >= min_time or batch >= 1 << 20:
+            break
+        batch *= 2 if dt <= 0 else max(2, min(10, int(min_time / dt) + 1))
+    best = dt
+    for _ in range(rounds - 1):
+        t0 = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return batch / best if best > 0 else float("inf")
+
+def peak_memory(setup):
+    # peak traced bytes during one call (tracemalloc is too slow to leave on while timing)
+    fn = setup()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def name_matches(name, pattern):
+    # glob against the whole case name or one of its "/" parts: "L1" is generate_maze/L1
+    # and friends but not L10, "update_visibility" is every level, "*/1001x*" the big grids
+    return fnmatch.fnmatchcase(name, pattern) or any(fnmatch.fnmatchcase(part, pattern) for part in name.split("/"))
+
+def run_benchmarks(quick=False, name_filter=None, min_time=MIN_TIME, rounds=ROUNDS, out=sys.stdout):
+    results = {}
+    for name, setup in build_cases(quick):
+        if name_filter and not name_matches(name, name_filter):
+            continue
+        ops = time_case(setup(), min_time, rounds)
+        peak = peak_memory(setup)
+        results[name] = {"ops_per_sec": ops, "peak_bytes": peak}
+        print(f"{name:<42} {ops:>14,.1f} ops/s {peak / 1024:>12,.1f} KiB", file=out)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "seed": BENCH_SEED,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+def compare(baseline, current, threshold):
+    # cases that got slower, or used more memory, by more than `threshold` (0.1 = 10%)
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        if now["ops_per_sec"] < before["ops_per_sec"] * (1.0 - threshold):
+            regressions.append((name, "ops_per_sec", before["ops_per_sec"], now["ops_per_sec"]))
+        if now["peak_bytes"] > before["peak_bytes"] * (1.0 + threshold) and now["peak_bytes"] - before["peak_bytes"] > 4096:
+            regressions.append((name, "peak_bytes", before["peak_bytes"], now["peak_bytes"]))
+    return regressions
+
+# ---------- main ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maze Dungeon microbenchmarks")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown/growth before flagging (default 0.10)")
+    parser.add_argument("--filter", default=None, help='only run cases matching this glob, whole name or one "/" part ("L1", "is_visible", "*/L1*")')
+    parser.add_argument("--quick", action="store_true", help="three level sizes, no synthetic sizes")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds per timing round")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(quick=args.quick, name_filter=args.filter, min_time=args.min_time)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+        print("Saved baseline:", args.save)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%}.")
+            return 0
+        print(f"Regressions beyond {args.threshold:.0%}:")
+        for name, metric, before, now in regressions:
+            print(f"  {name:<42} {metric}: {before:,.1f} -> {now:,.1f}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1095 @@
+"""
+maze_core.py
+Display-free maze simulation shared by the pygame front-end (Maze.py), bots and tools.
+- Grid storage, maze generators and the endless chunked world
+- MazeState: level setup, movement, visibility, hints and beacons with no pygame/SDL
+"""
+
+import random
+import time
+import heapq
+import operator
+from array import array
+from collections import OrderedDict
+from itertools import compress
+
+# ---------- Config ----------
+MAX_LEVEL = 10
+GENERATOR_VERSION = 1  # bump when generation output changes so old replays and packs are refused
+
+# Visibility
+BASE_REVEAL_RADIUS = 3
+GLOW_DURATION = 0.7  # seconds glow remains visible after movement (transient)
+
+# Pinger / hint
+PINGER_SHOW_SEC = 2.0  # arrow visible for this many seconds when clicked
+HINT_ROUTE_STEPS = 12  # tiles of the route previewed while a hint is showing
+ASTAR_MAX_NODES = 20000  # endless-mode route search budget before settling for a partial route
+
+# Endless mode: chunked world (see ChunkWorld)
+CHUNK_CELLS = 16                 # maze cells per chunk side
+CHUNK_TILES = 2 * CHUNK_CELLS    # tiles per chunk side
+ENDLESS_MAX_CHUNKS = 256         # chunks kept in memory (LRU)
+ENDLESS_VIEW = (41, 27)          # tiles shown around the player
+ENDLESS_BEACON_CHUNKS = 2        # how far away each new beacon is placed
+
+# Level sizes
+LEVEL_MAP = {
+    1: (31, 21),
+    2: (41, 27),
+    3: (55, 35),
+    4: (65, 45),
+    5: (75, 50),
+    6: (85, 54),
+    7: (95, 56),
+    8: (100, 58),
+    9: (105, 60),
+    10: (110, 62),
+}
+
+# Actions accepted by MazeState.step
+ACTION_UP = 0
+ACTION_DOWN = 1
+ACTION_LEFT = 2
+ACTION_RIGHT = 3
+ACTION_HINT = 4
+ACTION_REGENERATE = 5
+ACTION_NEXT = 6
+ACTION_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Events returned by MazeState.step
+EVENT_BLOCKED = "blocked"
+EVENT_MOVED = "moved"
+EVENT_EXIT = "exit"
+EVENT_BEACON = "beacon"
+EVENT_HINT = "hint"
+EVENT_LEVEL = "level"
+
+# next-hop table entry for walls, cut-off tiles and the goal itself
+NO_HOP = 255
+
+# ---------- grid ----------
+# maps a cell byte to 1 when it is floor, so bytes.translate gives an "is open" mask
+_OPEN_MASK = bytes([1]) + bytes(255)
+# tile values <-> ASCII binary digits, for packing a grid one bit per tile through int()
+_TILE_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_DIGIT_TILES = bytes.maketrans(b"01", b"\x00\x01")
+
+class Grid:
+    """Maze tiles as one flat row-major bytearray: 1 = wall, 0 = floor."""
+
+    __slots__ = ("width", "height", "cells")
+
+    def __init__(self, width, height, fill=1, cells=None):
+        self.width = width
+        self.height = height
+        self.cells = cells if cells is not None else bytearray([fill]) * (width * height)
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def coords(self, i):
+        y, x = divmod(i, self.width)
+        return x, y
+
+    def get(self, x, y):
+        return self.cells[y * self.width + x]
+
+    def set(self, x, y, v):
+        self.cells[y * self.width + x] = v
+
+    def is_open(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y * self.width + x] == 0
+
+    def copy(self):
+        return Grid(self.width, self.height, cells=bytearray(self.cells))
+
+    def pack(self):
+        # one bit per tile, row-major, first tile in the high bit of the first byte
+        n = len(self.cells)
+        bits = int(self.cells.translate(_TILE_DIGITS) or b"0", 2)
+        return (bits << (-n % 8)).to_bytes((n + 7) // 8, "big")
+
+    @classmethod
+    def unpack(cls, width, height, data):
+        n = width * height
+        digits = bin(int.from_bytes(data, "big") >> (-n % 8))[2:].encode("ascii").rjust(n, b"0")
+        return cls(width, height, cells=bytearray(digits.translate(_DIGIT_TILES)))
+
+    def open_mask(self):
+        return self.cells.translate(_OPEN_MASK)
+
+    def open_count(self):
+        return self.cells.count(0)
+
+    def open_indices(self):
+        return list(compress(range(len(self.cells)), self.open_mask()))
+
+    def open_neighbor_counts(self):
+        # per cell, how many of its 4 neighbours are floor (whole-buffer shifts of the open mask)
+        w, n = self.width, len(self.cells)
+        m = self.open_mask()
+        not_first_col = (bytes([0]) + bytes([1]) * (w - 1)) * self.height
+        not_last_col = (bytes([1]) * (w - 1) + bytes([0])) * self.height
+        left = bytes(map(operator.and_, bytes(1) + m[:-1], not_first_col))
+        right = bytes(map(operator.and_, m[1:] + bytes(1), not_last_col))
+        up = bytes(w) + m[:n - w]
+        down = m[w:] + bytes(w)
+        return bytes(map(operator.add, map(operator.add, left, right), map(operator.add, up, down)))
+
+    def first_open_by_diagonal(self):
+        # open cell with the smallest x + y (ties broken by smaller y, like a row-major scan)
+        w, h, cells = self.width, self.height, self.cells
+        for d in range(w + h - 1):
+            for y in range(max(0, d - w + 1), min(d, h - 1) + 1):
+                if cells[y * w + d - y] == 0:
+                    return d - y, y
+        return None
+
+    def window(self, x0, y0, width, height=None):
+        # width x height tiles from (x0, y0) as a flat bytearray; tiles off the grid read as wall
+        height = width if height is None else height
+        out = bytearray([1]) * (width * height)
+        w, cells = self.width, self.cells
+        lo, hi = max(0, x0), min(w, x0 + width)
+        if lo < hi:
+            for y in range(max(0, y0), min(self.height, y0 + height)):
+                o = (y - y0) * width + lo - x0
+                out[o:o + hi - lo] = cells[y * w + lo:y * w + hi]
+        return out
+
+# ---------- maze generation ----------
+# Every algorithm carves a perfect maze into an all-wall Grid whose cells sit on odd
+# coordinates (tiles between two cells are the walls that get knocked down). Each one
+# draws only from the random.Random it is given, never from the global random module.
+MAZE_ALGORITHMS = {}  # name -> {"carve": fn(grid, rng), "texture": str, "cells_per_sec": float or None}
+DEFAULT_MAZE_ALGORITHM = "backtracker"
+
+# random bit strings come out of format() as b"0"/b"1"; these map them to tile values
+_BIT_SET_OPENS = bytes.maketrans(b"01", b"\x01\x00")
+_BIT_CLEAR_OPENS = bytes.maketrans(b"01", b"\x00\x01")
+
+def maze_algorithm(name, texture):
+    def register(carve):
+        MAZE_ALGORITHMS[name] = {"carve": carve, "texture": texture, "cells_per_sec": None}
+        return carve
+    return register
+
+def _random_bits(rng, k):
+    return format(rng.getrandbits(k), f"0{k}b").encode("ascii") if k > 0 else b""
+
+def _open_cell_rows(grid):
+    # knock out every cell tile (odd x, odd y) in one slice per row
+    gw, cells = grid.width, grid.cells
+    cols = (gw - 1) // 2
+    for y in range(1, grid.height - 1, 2):
+        t = y * gw
+        cells[t+1:t+gw-1:2] = bytes(cols)
+
+@maze_algorithm("backtracker", "long winding corridors, few dead ends")
+def carve_backtracker(grid, rng):
+    gw, gh, cells = grid.width, grid.height, grid.cells
+    start = grid.index(1, 1)
+    cells[start] = 0
+    stack = array("i", [start])
+    row2 = 2*gw
+    choice = rng.choice
+    while stack:
+        i = stack[-1]
+        y, x = divmod(i, gw)
+        neighbors = []
+        if x + 2 < gw - 1 and cells[i + 2] == 1:
+            neighbors.append(2)
+        if x - 2 >= 1 and cells[i - 2] == 1:
+            neighbors.append(-2)
+        if y + 2 < gh - 1 and cells[i + row2] == 1:
+            neighbors.append(row2)
+        if y - 2 >= 1 and cells[i - row2] == 1:
+            neighbors.append(-row2)
+        if neighbors:
+            d = choice(neighbors)
+            cells[i + d//2] = 0
+            cells[i + d] = 0
+            stack.append(i + d)
+        else:
+            stack.pop()
+
+@maze_algorithm("kruskal", "short branches, many dead ends")
+def carve_kruskal(grid, rng):
+    gw, cells = grid.width, grid.cells
+    cols, rows = (gw - 1) // 2, (grid.height - 1) // 2
+    n = cols * rows
+    _open_cell_rows(grid)
+    # edge e: cell e >> 1 joined to its east (e & 1 == 0) or south (e & 1 == 1) neighbour
+    edges = [c << 1 for c in range(n) if c % cols != cols - 1]
+    edges += [(c << 1) | 1 for c in range(n - cols)]
+    rng.shuffle(edges)
+    parent = array("i", range(n))
+    joins = n - 1
+    for e in edges:
+        a = e >> 1
+        b = a + cols if e & 1 else a + 1
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a == b:
+            continue
+        parent[a] = b
+        cy, cx = divmod(e >> 1, cols)
+        t = (2*cy + 1) * gw + 2*cx + 1
+        cells[t + gw if e & 1 else t + 1] = 0
+        joins -= 1
+        if not joins:
+            break
+
+@maze_algorithm("wilson", "uniform spanning tree, unbiased")
+def carve_wilson(grid, rng):
+    gw, cells = grid.width, grid.cells
+    cols, rows = (gw - 1) // 2, (grid.height - 1) // 2
+    n = cols * rows
+    _open_cell_rows(grid)
+    in_tree = bytearray(n)
+    in_tree[rng.randrange(n)] = 1
+    step = bytearray(n)  # last direction taken out of each cell; loops erase themselves
+    moves = (1, -1, cols, -cols)  # east, west, south, north in cell space
+    walls = (1, -1, gw, -gw)      # the tile between in grid space
+    rnd = rng.random
+    for start in range(n):
+        c = start
+        while not in_tree[c]:
+            cy, cx = divmod(c, cols)
+            dirs = []
+            if cx + 1 < cols:
+                dirs.append(0)
+            if cx > 0:
+                dirs.append(1)
+            if cy + 1 < rows:
+                dirs.append(2)
+            if cy > 0:
+                dirs.append(3)
+            d = dirs[int(rnd() * len(dirs))]
+            step[c] = d
+            c += moves[d]
+        c = start
+        while not in_tree[c]:
+            in_tree[c] = 1
+            d = step[c]
+            cy, cx = divmod(c, cols)
+            cells[(2*cy + 1) * gw + 2*cx + 1 + walls[d]] = 0
+            c += moves[d]
+
+@maze_algorithm("eller", "row-streamed, long horizontal runs")
+def carve_eller(grid, rng):
+    gw, cells = grid.width, grid.cells
+    cols, rows = (gw - 1) // 2, (grid.height - 1) // 2
+    rnd = rng.random
+    sets = [0] * cols
+    next_set = 1
+    for cy in range(rows):
+        t = (2*cy + 1) * gw
+        cells[t+1:t+gw-1:2] = bytes(cols)
+        members = {}
+        for cx in range(cols):
+            if not sets[cx]:
+                sets[cx] = next_set
+                next_set += 1
+            members.setdefault(sets[cx], []).append(cx)
+        last = cy == rows - 1
+        for cx in range(cols - 1):
+            a, b = sets[cx], sets[cx + 1]
+            if a != b and (last or rnd() < 0.5):
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for k in members[b]:
+                    sets[k] = a
+                members[a].extend(members.pop(b))
+                cells[t + 2*cx + 2] = 0
+        if last:
+            break
+        below = [0] * cols
+        for sid, cxs in members.items():
+            forced = cxs[int(rnd() * len(cxs))]
+            for cx in cxs:
+                if cx == forced or rnd() < 0.3:
+                    cells[t + gw + 2*cx + 1] = 0
+                    below[cx] = sid
+        sets = below
+
+@maze_algorithm("binary_tree", "diagonal bias, open north and west edges")
+def carve_binary_tree(grid, rng):
+    # one random bit per cell picks north (1) or west (0); whole rows are written with slices
+    gw, cells = grid.width, grid.cells
+    cols = (gw - 1) // 2
+    _open_cell_rows(grid)
+    cells[gw+2:2*gw-2:2] = bytes(cols - 1)  # first row can only go west
+    for y in range(3, grid.height - 1, 2):
+        t = y * gw
+        bits = b"1" + _random_bits(rng, cols - 1)  # first column can only go north
+        cells[t-gw+1:t-1:2] = bits.translate(_BIT_SET_OPENS)
+        cells[t+2:t+gw-2:2] = bits[1:].translate(_BIT_CLEAR_OPENS)
+
+@maze_algorithm("sidewinder", "vertical bias, open north edge")
+def carve_sidewinder(grid, rng):
+    # bits decide "carve east" for a whole row at once; each run then opens north from one member
+    gw, cells = grid.width, grid.cells
+    cols = (gw - 1) // 2
+    rnd = rng.random
+    _open_cell_rows(grid)
+    cells[gw+2:2*gw-2:2] = bytes(cols - 1)  # first row is one corridor
+    for y in range(3, grid.height - 1, 2):
+        t = y * gw
+        bits = _random_bits(rng, cols - 1)
+        cells[t+2:t+gw-2:2] = bits.translate(_BIT_SET_OPENS)
+        run = 0
+        while run < cols:
+            end = bits.find(b"0", run)
+            if end < 0:
+                end = cols - 1
+            cx = run + int(rnd() * (end - run + 1))
+            cells[t - gw + 2*cx + 1] = 0
+            run = end + 1
+
+def generate_maze(width, height, seed=None, algorithm=DEFAULT_MAZE_ALGORITHM):
+    gw = width if width%2==1 else width+1
+    gh = height if height%2==1 else height+1
+    grid = Grid(gw, gh)
+    MAZE_ALGORITHMS[algorithm]["carve"](grid, random.Random(seed))
+    return grid
+
+def measure_maze_algorithms(width=301, height=301, seed=0, rounds=3):
+    # best-of-n throughput per algorithm, published back into MAZE_ALGORITHMS
+    for name, algo in MAZE_ALGORITHMS.items():
+        best = None
+        for r in range(rounds):
+            t0 = time.perf_counter()
+            generate_maze(width, height, seed + r, algorithm=name)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        algo["cells_per_sec"] = width * height / max(best, 1e-9)
+    return {name: algo["cells_per_sec"] for name, algo in MAZE_ALGORITHMS.items()}
+
+def fastest_maze_algorithm(allowed=None):
+    # fastest registered algorithm, optionally limited to the names whose texture fits
+    names = [n for n in MAZE_ALGORITHMS if allowed is None or n in allowed]
+    if any(MAZE_ALGORITHMS[n]["cells_per_sec"] is None for n in names):
+        measure_maze_algorithms()
+    return max(names, key=lambda n: MAZE_ALGORITHMS[n]["cells_per_sec"])
+
+def find_open_positions(grid):
+    # flat indices of every floor tile
+    return grid.open_indices()
+
+def _loop_walls(grid):
+    # wall tiles with floor on exactly two opposite sides: knocking one out joins two
+    # corridors. Whole-grid masks as big ints, one byte per tile (shifting by 8 bits moves
+    # a byte one tile, 8*w one row); the wall border keeps row wrap-around from matching.
+    n, w = len(grid.cells), grid.width
+    ones = int.from_bytes(b"\x01" * n, "big")
+    m = int.from_bytes(grid.open_mask(), "big")
+    walls = ones ^ m
+    left, right = m >> 8, (m << 8) & ones
+    up, down = m >> (8 * w), (m << (8 * w)) & ones
+    straight = (left & right & (ones ^ (up | down))) | (up & down & (ones ^ (left | right)))
+    return array("i", compress(range(n), (walls & straight).to_bytes(n, "big")))
+
+def _closable_per_block(cells, w, label, roots):
+    # Tarjan's algorithm (iterative, flat arrays) from each root over the floor tiles that
+    # share its label; yields, per biconnected block, its tiles with two or more open
+    # neighbours that are not cut vertices. Without one of those its block stays connected,
+    # and blocks only meet at cut vertices, so taking at most one tile out of each block is
+    # always safe. The labelled regions never touch each other's tiles, so they share arrays.
+    n = len(cells)
+    disc = array("i", bytes(4 * n))   # discovery time within its region, 0 = not reached yet
+    low = array("i", bytes(4 * n))
+    nxt = bytearray(n)                # next neighbour to look at, per tile on the path
+    cut = bytearray(n)
+    offs = (1, -1, w, -w)
+    for root in roots:
+        region = label[root]
+        path = array("i", [root])     # the DFS path; path[-2] is the parent of path[-1]
+        pending = array("i")          # reached tiles not yet assigned to a block
+        disc[root] = low[root] = t = 1
+        while path:
+            v = path[-1]
+            parent = path[-2] if len(path) > 1 else -1
+            k = nxt[v]
+            while k < 4:
+                u = v + offs[k]
+                k += 1
+                if label[u] != region:  # walls are labelled -1
+                    continue
+                if not disc[u]:
+                    nxt[v] = k
+                    t += 1
+                    disc[u] = low[u] = t
+                    path.append(u)
+                    pending.append(u)
+                    break
+                if disc[u] < low[v] and u != parent:
+                    low[v] = disc[u]
+            else:
+                path.pop()
+                if parent < 0:
+                    break
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+                if low[v] >= disc[parent]:
+                    # v's subtree (what is still pending above it) closes a block at parent
+                    if parent != root:
+                        cut[parent] = 1
+                    block = array("i")
+                    while True:
+                        u = pending.pop()
+                        if not cut[u] and 4 - (cells[u + 1] + cells[u - 1] + cells[u + w] + cells[u - w]) >= 2:
+                            block.append(u)
+                        if u == v:
+                            break
+                    if block:
+                        yield block
+
+def add_extra_walls(grid, chance, rng, start):
+    # harder, still fully connected mazes for the later levels. First, `chance` of the walls
+    # between two corridors are knocked out, each making a loop, but only where both sides
+    # hang off the same tile of the route from `start` to the farthest tile: the loops sit in
+    # side branches (false leads with no dead end to give them away) and never shorten that
+    # route. Then each loop-bearing block gets, with probability `chance`, one extra wall on
+    # a tile that is not a cut vertex (found by Tarjan's algorithm over just the branches that
+    # got loops), at most one per block, so nothing is cut off.
+    # Returns (walls opened, tiles closed). (Tiles are assumed to have a wall border, as
+    # every generated maze does.)
+    cells, w = grid.cells, grid.width
+    hops = bytearray([NO_HOP]) * len(cells)
+    dist = bfs_distances(grid, start, hops)
+    # label every tile with the route tile its branch hangs from (route tiles label themselves)
+    label = array("i", [-1]) * len(cells)
+    back = [dx + dy * w for dx, dy in ACTION_DELTAS]
+    i = dist.index(max(dist))
+    del dist
+    frontier = [i]
+    label[i] = i
+    while i != start:
+        i += back[hops[i]]
+        label[i] = i
+        frontier.append(i)
+    while frontier:
+        nxt = []
+        for c in frontier:
+            for j in (c + 1, c - 1, c + w, c - w):
+                if cells[j] == 0 and label[j] < 0:
+                    label[j] = label[c]
+                    nxt.append(j)
+        frontier = nxt
+    del hops
+    loops = array("i", (i for i in _loop_walls(grid)
+                        if (label[i - 1] == label[i + 1] if cells[i - 1] == 0 else label[i - w] == label[i + w])))
+    opened = rng.sample(loops, int(len(loops) * chance))
+    del loops
+    regions = [label[i + 1] if cells[i - 1] == 0 else label[i + w] for i in opened]  # before any is opened
+    for i, region in zip(opened, regions):
+        cells[i] = 0
+        label[i] = region
+    # every loop, so every block worth a wall, lies inside one labelled branch and its route tile
+    closing = []
+    for block in _closable_per_block(cells, w, label, sorted(set(regions))):
+        if rng.random() < chance:
+            closing.append(rng.choice(block))
+    for i in closing:
+        cells[i] = 1
+    return len(opened), len(closing)
+
+def bfs_distances(grid, start, hops=None):
+    # steps from flat index `start` to every tile in one linear pass; -1 = wall or unreachable.
+    # Pass a bytearray of NO_HOP as `hops` to also record, per tile, the ACTION_* that steps
+    # one tile back toward `start` (the tile it was discovered from).
+    cells, w = grid.cells, grid.width
+    dist = array("i", [-1]) * len(cells)
+    dist[start] = 0
+    frontier = [start]
+    d = 0
+    if hops is None:
+        while frontier:
+            d += 1
+            nxt = []
+            for c in frontier:
+                for j in (c + 1, c - 1, c + w, c - w):
+                    if cells[j] == 0 and dist[j] < 0:
+                        dist[j] = d
+                        nxt.append(j)
+            frontier = nxt
+        return dist
+    steps = ((1, ACTION_LEFT), (-1, ACTION_RIGHT), (w, ACTION_UP), (-w, ACTION_DOWN))
+    while frontier:
+        d += 1
+        nxt = []
+        for c in frontier:
+            for off, back in steps:
+                j = c + off
+                if cells[j] == 0 and dist[j] < 0:
+                    dist[j] = d
+                    hops[j] = back
+                    nxt.append(j)
+        frontier = nxt
+    return dist
+
+def astar_route(grid, start, goal, max_nodes=ASTAR_MAX_NODES):
+    # shortest route from start to goal on anything with is_open(x, y) (works on ChunkWorld).
+    # Returns the tiles after start, ending at goal; if the budget runs out first, the route
+    # to the expanded tile nearest the goal is returned instead, so very far goals still
+    # get a useful partial route.
+    gx, gy = goal
+    came = {start: None}
+    cost = {start: 0}
+    best = start
+    best_h = abs(start[0] - gx) + abs(start[1] - gy)
+    heap = [(best_h, best_h, start)]
+    expanded = 0
+    while heap and expanded < max_nodes:
+        _, h, pos = heapq.heappop(heap)
+        if pos == goal:
+            best = pos
+            break
+        if h < best_h:
+            best, best_h = pos, h
+        expanded += 1
+        x, y = pos
+        g = cost[pos] + 1
+        for dx, dy in ACTION_DELTAS:
+            nxt = (x + dx, y + dy)
+            if g < cost.get(nxt, g + 1) and grid.is_open(*nxt):
+                cost[nxt] = g
+                came[nxt] = pos
+                nh = abs(nxt[0] - gx) + abs(nxt[1] - gy)
+                heapq.heappush(heap, (g + nh, nh, nxt))
+    route = []
+    while best != start:
+        route.append(best)
+        best = came[best]
+    route.reverse()
+    return route
+
+# ---------- levels ----------
+class Level:
+    """A finite level ready to play: grid, start, exit, both BFS distance fields and
+    the next-hop table toward the exit (one ACTION_* per tile, NO_HOP elsewhere)."""
+
+    __slots__ = ("number", "seed", "grid", "start", "exit", "dist_from_start", "dist_to_exit", "next_hop")
+
+    def __init__(self, number, seed, grid, start, exit, dist_from_start, dist_to_exit, next_hop):
+        self.number = number
+        self.seed = seed
+        self.grid = grid
+        self.start = start
+        self.exit = exit
+        self.dist_from_start = dist_from_start
+        self.dist_to_exit = dist_to_exit
+        self.next_hop = next_hop
+
+    @property
+    def solution_length(self):
+        sx, sy = self.start
+        return self.dist_to_exit[sy * self.grid.width + sx]
+
+    def distance_to_exit(self, x, y):
+        # walking distance, or -1 for walls / cut-off tiles
+        return self.dist_to_exit[y * self.grid.width + x]
+
+    def next_step(self, x, y):
+        # the ACTION_* leading one tile closer to the exit, or None at the exit / off the maze
+        a = self.next_hop[y * self.grid.width + x]
+        return None if a == NO_HOP else a
+
+    def route_from(self, x, y, max_steps):
+        # up to max_steps tiles of the shortest route, following the table (no search)
+        hops, w = self.next_hop, self.grid.width
+        route = []
+        a = hops[y * w + x]
+        while a != NO_HOP and len(route) < max_steps:
+            dx, dy = ACTION_DELTAS[a]
+            x += dx
+            y += dy
+            route.append((x, y))
+            a = hops[y * w + x]
+        return route
+
+def extra_wall_chance(level):
+    return 0.04 + (level - 3) * 0.015 if level >= 3 else 0.0
+
+def build_level(level, seed, algorithm=DEFAULT_MAZE_ALGORITHM, size=None):
+    # size: (width, height) instead of the level's own; the level number still sets the extra walls
+    w, h = size or LEVEL_MAP.get(level, (33,21))
+    grid = generate_maze(w, h, seed=seed, algorithm=algorithm)
+    start = grid.index(*grid.first_open_by_diagonal())
+    chance = extra_wall_chance(level)
+    if chance > 0:
+        add_extra_walls(grid, chance, random.Random(f"walls:{seed}"), start)
+    # the exit is the tile farthest from the start by actual walking distance
+    from_start = bfs_distances(grid, start)
+    exit_index = from_start.index(max(from_start))
+    hops = bytearray([NO_HOP]) * len(grid.cells)
+    to_exit = bfs_distances(grid, exit_index, hops)
+    return Level(level, seed, grid, grid.coords(start), grid.coords(exit_index), from_start, to_exit, hops)
+
+# ---------- endless world ----------
+# The endless world is cut into square chunks of CHUNK_TILES x CHUNK_TILES tiles. A chunk owns
+# its west column and north row of walls; its cells sit on odd local coordinates, so the cell
+# tiles facing a neighbour's border are always floor and a door in the border joins them.
+def generate_chunk(seed, cx, cy, algorithm=DEFAULT_MAZE_ALGORITHM):
+    t = CHUNK_TILES
+    inner = Grid(t + 1, t + 1)
+    MAZE_ALGORITHMS[algorithm]["carve"](inner, random.Random(f"{seed}:chunk:{cx}:{cy}"))
+    cells = bytearray()
+    for y in range(t):
+        cells += inner.cells[y*(t+1):y*(t+1) + t]  # drop the east column / south row, the neighbour owns them
+    chunk = Grid(t, t, cells=cells)
+    doors = random.Random(f"{seed}:doors:{cx}:{cy}")
+    chunk.set(0, 2*doors.randrange(CHUNK_CELLS) + 1, 0)  # west door
+    chunk.set(2*doors.randrange(CHUNK_CELLS) + 1, 0, 0)  # north door
+    return chunk
+
+class ChunkWorld:
+    """Unbounded maze addressed by world tile coordinates.
+
+    Chunks are derived from (seed, chunk coordinate) when first touched and kept
+    in an LRU of max_chunks, so memory and per-lookup cost stay flat however far
+    the player walks. Evicted chunks regenerate identically.
+    """
+
+    def __init__(self, seed, max_chunks=ENDLESS_MAX_CHUNKS, algorithm=DEFAULT_MAZE_ALGORITHM):
+        self.seed = seed
+        self.max_chunks = max_chunks
+        self.algorithm = algorithm
+        self.chunks = OrderedDict()
+        self.generated = 0
+        self.last_key = None
+        self.last_chunk = None
+
+    def chunk(self, cx, cy):
+        key = (cx, cy)
+        if key == self.last_key:
+            return self.last_chunk
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = generate_chunk(self.seed, cx, cy, self.algorithm)
+            self.generated += 1
+            self.chunks[key] = chunk
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        self.last_key = key
+        self.last_chunk = chunk
+        return chunk
+
+    def get(self, x, y):
+        t = CHUNK_TILES
+        return self.chunk(x // t, y // t).cells[(y % t) * t + x % t]
+
+    def is_open(self, x, y):
+        return self.get(x, y) == 0
+
+    def window(self, x0, y0, width, height=None):
+        # same as Grid.window, copied out chunk row by chunk row
+        t = CHUNK_TILES
+        height = width if height is None else height
+        out = bytearray(width * height)
+        for wy in range(height):
+            y = y0 + wy
+            row = (y % t) * t
+            x = x0
+            o = wy * width
+            end = o + width
+            while o < end:
+                lx = x % t
+                n = min(t - lx, end - o)
+                out[o:o + n] = self.chunk(x // t, y // t).cells[row + lx:row + lx + n]
+                o += n
+                x += n
+        return out
+
+    def beacon_near(self, x, y, rng):
+        # a floor tile about ENDLESS_BEACON_CHUNKS chunks away from (x, y), in a random direction
+        t = CHUNK_TILES
+        while True:
+            dcx = rng.randint(-ENDLESS_BEACON_CHUNKS, ENDLESS_BEACON_CHUNKS)
+            dcy = rng.randint(-ENDLESS_BEACON_CHUNKS, ENDLESS_BEACON_CHUNKS)
+            if max(abs(dcx), abs(dcy)) == ENDLESS_BEACON_CHUNKS:
+                break
+        bx = (x // t + dcx) * t + 2*rng.randrange(CHUNK_CELLS) + 1
+        by = (y // t + dcy) * t + 2*rng.randrange(CHUNK_CELLS) + 1
+        return bx, by
+
+# ---------- visibility ----------
+# Light is cast with recursive shadowcasting (run with an explicit stack) over a
+# (2r+1) x (2r+1) window copied out of the grid around the player. The per-octant scan
+# order, slopes and window offsets depend only on the radius, so they are built once per
+# radius. The lit shape is the diamond |dx| + |dy| <= r the game has always used; walls
+# block light but are never lit themselves, since only floor tiles glow.
+NEVER_SEEN = float("-inf")
+
+# (xx, xy, yx, yy) maps octant-local (col, row) onto (dx, dy)
+_OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+_FOV_TABLES = {}
+
+def fov_table(radius):
+    # per octant, per row: (window index, left slope, right slope, inside the diamond)
+    table = _FOV_TABLES.get(radius)
+    if table is None:
+        size = 2 * radius + 1
+        centre = radius * size + radius
+        table = []
+        for xx, xy, yx, yy in _OCTANTS:
+            rows = []
+            for j in range(1, radius + 1):
+                row = []
+                for dx in range(-j, 1):
+                    dy = -j
+                    x, y = dx * xx + dy * xy, dx * yx + dy * yy
+                    row.append((centre + y * size + x, (dx - 0.5) / (dy + 0.5), (dx + 0.5) / (dy - 0.5),
+                                abs(x) + abs(y) <= radius))
+                rows.append(row)
+            table.append(rows)
+        table = _FOV_TABLES[radius] = tuple(table)
+    return table
+
+def field_of_view(grid, x, y, radius):
+    # floor tiles lit from (x, y), as world coordinates; (x, y) itself is always included
+    size = 2 * radius + 1
+    x0, y0 = x - radius, y - radius
+    cells = grid.window(x0, y0, size)
+    lit = {radius * size + radius}
+    for rows in fov_table(radius):
+        stack = [(0, 1.0, 0.0)]
+        while stack:
+            j, start, end = stack.pop()
+            while j < radius:
+                blocked = False
+                new_start = start
+                for i, l_slope, r_slope, inside in rows[j]:
+                    if start < r_slope:
+                        continue
+                    if end > l_slope:
+                        break
+                    wall = cells[i]
+                    if inside and not wall:
+                        lit.add(i)
+                    if blocked:
+                        if wall:
+                            new_start = r_slope
+                        else:
+                            blocked = False
+                            start = new_start
+                    elif wall:
+                        blocked = True
+                        stack.append((j + 1, start, l_slope))
+                        new_start = r_slope
+                if blocked:
+                    break
+                j += 1
+    return [(x0 + i % size, y0 + i // size) for i in lit]
+
+class SeenMap:
+    """Last-seen time and explored bit per tile of a finite level, in flat arrays."""
+
+    __slots__ = ("width", "height", "last_seen", "explored", "explored_tiles")
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.last_seen = array("d", [NEVER_SEEN]) * (width * height)
+        self.explored = bytearray((width * height + 7) >> 3)
+        self.explored_tiles = 0
+
+    def stamp(self, points, now):
+        w, last_seen, explored = self.width, self.last_seen, self.explored
+        for x, y in points:
+            i = y * w + x
+            last_seen[i] = now
+            bit = 1 << (i & 7)
+            if not explored[i >> 3] & bit:
+                explored[i >> 3] |= bit
+                self.explored_tiles += 1
+
+    def seen_at(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.last_seen[y * self.width + x]
+        return NEVER_SEEN
+
+    def is_explored(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = y * self.width + x
+            return bool(self.explored[i >> 3] & (1 << (i & 7)))
+        return False
+
+class ChunkSeenMap:
+    """SeenMap for the endless world: one page of arrays per chunk, at most max_chunks
+    pages (LRU), so memory stays bounded however far the player walks. Evicted pages
+    are simply forgotten (their glow has long expired)."""
+
+    def __init__(self, max_chunks=ENDLESS_MAX_CHUNKS):
+        self.max_chunks = max_chunks
+        self.pages = OrderedDict()
+        self.explored_tiles = 0
+
+    def _page(self, cx, cy, create=False):
+        key = (cx, cy)
+        page = self.pages.get(key)
+        if page is None and create:
+            n = CHUNK_TILES * CHUNK_TILES
+            page = self.pages[key] = (array("d", [NEVER_SEEN]) * n, bytearray(n >> 3))
+            if len(self.pages) > self.max_chunks:
+                self.pages.popitem(last=False)
+        elif page is not None and create:
+            self.pages.move_to_end(key)
+        return page
+
+    def stamp(self, points, now):
+        t = CHUNK_TILES
+        for x, y in points:
+            last_seen, explored = self._page(x // t, y // t, create=True)
+            i = (y % t) * t + x % t
+            last_seen[i] = now
+            bit = 1 << (i & 7)
+            if not explored[i >> 3] & bit:
+                explored[i >> 3] |= bit
+                self.explored_tiles += 1
+
+    def seen_at(self, x, y):
+        t = CHUNK_TILES
+        page = self._page(x // t, y // t)
+        return NEVER_SEEN if page is None else page[0][(y % t) * t + x % t]
+
+    def is_explored(self, x, y):
+        t = CHUNK_TILES
+        page = self._page(x // t, y // t)
+        if page is None:
+            return False
+        i = (y % t) * t + x % t
+        return bool(page[1][i >> 3] & (1 << (i & 7)))
+
+# ---------- simulation ----------
+class MazeState:
+    """Game rules without a display: level setup, movement, visibility, hints.
+
+    step(action) applies one ACTION_* and returns an EVENT_* string. The clock
+    is injectable so bots and tests can run on simulated time; pass
+    visibility=False to skip glow bookkeeping when nothing will be drawn.
+    With auto_advance the next level starts as soon as an exit is reached
+    (the finished run is kept in last_run); otherwise the caller decides.
+    A recorder (maze_replay.ReplayRecorder) is told about every level start,
+    move and hint, which is all playback needs to rebuild the session.
+    A seed table ({level: [seeds]}, see maze_difficulty.py) limits random seeds
+    to the ones listed for that level.
+    """
+
+    def __init__(self, level=1, fixed_seed=None, endless=False, clock=time.time,
+                 visibility=True, auto_advance=False, recorder=None, prepared=None, seed_table=None):
+        self.clock = clock
+        self.recorder = recorder
+        self.fixed_seed = fixed_seed
+        self.endless = endless
+        self.visibility = visibility
+        self.auto_advance = auto_advance
+        self.beacons_found = 0
+        self.moves = 0
+        self.hint_count = 0
+        self.pinger_active_until = 0.0
+        self.last_run = None
+        self.route_cache = None     # endless mode: (goal, route tiles incl. start, tile -> index)
+        self.seed_rng = random.Random()
+        self.seed_table = seed_table or {}
+
+        self.generate_for_level(level, prepared)
+
+    def choose_seed(self, level=None):
+        return self.fixed_seed if self.fixed_seed is not None else self.random_seed(level)
+
+    def random_seed(self, level=None):
+        # from this state's own RNG, so nothing depends on (or disturbs) the global one;
+        # one of the seed table's seeds for `level` when it lists any
+        seeds = self.seed_table.get(level)
+        if seeds and not self.endless:
+            return self.seed_rng.choice(seeds)
+        return self.seed_rng.randint(0, 2**30)
+
+    def generate_for_level(self, level, prepared=None, seed=None):
+        # prepared: a Level for this level number already built with build_level (for
+        # example in the background while the previous one was being celebrated);
+        # seed: build with this seed instead of choose_seed() (replays)
+        self.level = max(1, min(MAX_LEVEL, level))
+        if prepared is not None:
+            seed = prepared.seed
+        elif seed is None:
+            seed = self.choose_seed(self.level)
+        self.seed_used = seed
+        if self.endless:
+            self.level_data = None
+            self.grid = ChunkWorld(seed)
+            self.player_pos = (1, 1)
+            self.beacon_rng = random.Random(f"beacons:{seed}")
+            self.beacons_found = 0
+            self.exit_pos = self.grid.beacon_near(1, 1, self.beacon_rng)
+        else:
+            self.level_data = prepared if prepared is not None else build_level(self.level, seed)
+            self.grid = self.level_data.grid
+            self.player_pos = self.level_data.start
+            self.exit_pos = self.level_data.exit
+
+        if self.level == 1:
+            self.reveal_radius = BASE_REVEAL_RADIUS + 1
+        else:
+            self.reveal_radius = max(2, BASE_REVEAL_RADIUS - 1)
+
+        self.seen_map = ChunkSeenMap() if self.endless else SeenMap(self.grid.width, self.grid.height)
+        self.update_visibility()
+
+        self.moves = 0
+        self.start_time = self.clock()
+        self.hint_count = 0
+        self.pinger_active_until = 0.0
+        self.route_cache = None
+        if self.recorder is not None:
+            self.recorder.level_started(self)
+
+    def step(self, action):
+        if action <= ACTION_RIGHT:
+            event = self.try_move(*ACTION_DELTAS[action])
+            if event == EVENT_EXIT and self.auto_advance:
+                self.last_run = self.complete_level()
+                self.generate_for_level(min(MAX_LEVEL, self.level + 1))
+            return event
+        if action == ACTION_HINT:
+            self.trigger_hint()
+            return EVENT_HINT
+        if action == ACTION_REGENERATE:
+            self.fixed_seed = None
+            self.generate_for_level(self.level)
+            return EVENT_LEVEL
+        if action == ACTION_NEXT:
+            self.generate_for_level(min(MAX_LEVEL, self.level + 1))
+            return EVENT_LEVEL
+        raise ValueError(f"unknown action: {action!r}")
+
+    def try_move(self, dx, dy):
+        if self.recorder is not None:
+            self.recorder.action(ACTION_DELTAS.index((dx, dy)), self.clock())
+        nx = self.player_pos[0] + dx
+        ny = self.player_pos[1] + dy
+        if not self.grid.is_open(nx, ny):
+            return EVENT_BLOCKED
+        self.player_pos = (nx, ny)
+        self.moves += 1
+        if self.visibility:
+            self.update_visibility()
+        if self.player_pos != self.exit_pos:
+            return EVENT_MOVED
+        if self.endless:
+            self.beacons_found += 1
+            self.exit_pos = self.grid.beacon_near(nx, ny, self.beacon_rng)
+            return EVENT_BEACON
+        return EVENT_EXIT
+
+    def trigger_hint(self):
+        if self.recorder is not None:
+            self.recorder.action(ACTION_HINT, self.clock())
+        self.pinger_active_until = self.clock() + PINGER_SHOW_SEC
+        self.hint_count += 1
+        if self.endless:
+            self._endless_route()  # search now, so drawing the hint is only lookups
+
+    def _endless_route(self):
+        # cached A* route to the beacon, reused while the player stays on it
+        cache = self.route_cache
+        if (cache is not None and cache[0] == self.exit_pos and self.player_pos in cache[2]
+                and (self.player_pos != cache[1][-1] or self.player_pos == self.exit_pos)):
+            return cache
+        route = [self.player_pos] + astar_route(self.grid, self.player_pos, self.exit_pos)
+        self.route_cache = cache = (self.exit_pos, route, {p: i for i, p in enumerate(route)})
+        return cache
+
+    def next_hint_step(self):
+        # the ACTION_* that follows the real route from the player, or None
+        px, py = self.player_pos
+        if self.level_data is not None:
+            return self.level_data.next_step(px, py)
+        _, route, index = self._endless_route()
+        i = index[self.player_pos]
+        if i + 1 >= len(route):
+            return None
+        nx, ny = route[i + 1]
+        return ACTION_DELTAS.index((nx - px, ny - py))
+
+    def hint_route(self, max_steps=HINT_ROUTE_STEPS):
+        # the next max_steps tiles of the route from the player
+        if self.level_data is not None:
+            return self.level_data.route_from(*self.player_pos, max_steps)
+        _, route, index = self._endless_route()
+        i = index[self.player_pos]
+        return route[i + 1:i + 1 + max_steps]
+
+    def pinger_remaining(self, now=None):
+        now = self.clock() if now is None else now
+        return max(0.0, self.pinger_active_until - now)
+
+    def elapsed(self):
+        return self.clock() - self.start_time
+
+    def distance_to_exit(self, x=None, y=None):
+        # O(1) walking distance to the exit from (x, y) (default: the player); None in endless mode
+        if self.level_data is None:
+            return None
+        if x is None:
+            x, y = self.player_pos
+        return self.level_data.distance_to_exit(x, y)
+
+    def solution_length(self):
+        return self.level_data.solution_length if self.level_data is not None else None
+
+    def complete_level(self):
+        # summary of the level just finished (the caller records it and moves on)
+        return {
+            "level": self.level,
+            "seed": self.seed_used,
+            "time": self.elapsed(),
+            "moves": self.moves,
+            "hints": self.hint_count,
+            "shortest": self.solution_length(),
+        }
+
+    def update_visibility(self):
+        # light the player's field of view; cost depends only on reveal_radius
+        # (last_lit / last_lit_at let a renderer update only the tiles that just lit up)
+        px, py = self.player_pos
+        self.last_lit = field_of_view(self.grid, px, py, self.reveal_radius)
+        self.last_lit_at = self.clock()
+        self.seen_map.stamp(self.last_lit, self.last_lit_at)
+
+    def is_visible(self, tx, ty, now=None):
+        if (tx, ty) == self.player_pos:
+            return True
+        return ((self.clock() if now is None else now) - self.seen_map.seen_at(tx, ty)) <= GLOW_DURATION
+
+    def is_explored(self, tx, ty):
+        return self.seen_map.is_explored(tx, ty)
+
+    def open_directions(self):
+        px, py = self.player_pos
+        return tuple(a for a, (dx, dy) in enumerate(ACTION_DELTAS) if self.grid.is_open(px + dx, py + dy))
+
+    def observation(self):
+        return {
+            "level": self.level,
+            "seed": self.seed_used,
+            "player": self.player_pos,
+            "moves": self.moves,
+            "hints": self.hint_count,
+            "elapsed": self.elapsed(),
+            "open": self.open_directions(),
+            "beacons": self.beacons_found,
+            "explored": self.seen_map.explored_tiles,
+        }
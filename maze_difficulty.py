@@ -0,0 +1,162 @@
+"""
+maze_difficulty.py
+Difficulty metrics for built levels and a parallel search for seeds of matching difficulty (no display needed).
+- Metrics from one linear pass over the grid: solution length, dead ends, branching along the
+  solution, mean corridor length and the share of floor off the solution path
+- The seed search scores --samples seeds per level on a process pool and keeps the ones whose
+  score falls in a percentile band of that level's own distribution
+- python Maze.py --seeds FILE then draws every random seed from the table
+
+    python maze_difficulty.py --levels all --samples 2000 --band 40-60 --out seeds.json
+    python maze_difficulty.py --show 7 12345
+"""
+
+import argparse
+import json
+import operator
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from maze_core import LEVEL_MAP, build_level
+from maze_farm import parse_levels, seed_batches
+from maze_profiler import nearest_rank
+
+SEED_TABLE_VERSION = 1
+
+# ---------- metrics ----------
+def analyze_level(lv):
+    # metrics of a built Level. Every floor tile's degree (open neighbours) comes from one
+    # pass over the grid; the rest is counting degrees and walking the solution once.
+    grid = lv.grid
+    w = grid.width
+    degree = bytes(map(operator.mul, grid.open_neighbor_counts(), grid.open_mask()))
+    dead_ends, corridor, three, four = (degree.count(k) for k in (1, 2, 3, 4))
+    open_tiles = grid.open_count()
+    # corridors run between tiles that are not plain corridor (dead ends and junctions);
+    # each corridor has two ends, so the ends at those tiles count every corridor twice
+    ends = dead_ends + 3 * three + 4 * four
+    steps = (ends + 2 * corridor) // 2
+    solution = lv.solution_length
+    sx, sy = lv.start
+    path = lv.route_from(sx, sy, solution)[:-1]  # tiles between start and exit
+    side_exits = degree[sy * w + sx] - 1 + sum(degree[y * w + x] - 2 for x, y in path)
+    metrics = {
+        "solution": solution,
+        "dead_ends": dead_ends,
+        "junctions": three + four,
+        "branching": side_exits / solution if solution > 0 else 0.0,
+        "corridor": steps / (ends / 2) if ends else float(steps),
+        "off_path": 1.0 - (solution + 1) / open_tiles if open_tiles else 0.0,
+    }
+    metrics["score"] = difficulty_score(metrics)
+    return metrics
+
+def difficulty_score(m):
+    # walking (solution length) weighted by how many wrong turns the route offers
+    # (side exits per tile) and how much of the maze those turns lead into
+    return m["solution"] * (1.0 + m["branching"]) * (1.0 + m["off_path"])
+
+# ---------- search ----------
+def score_batch(task):
+    # worker entry point: (level, seeds) -> (level, [(seed, score)])
+    level, seeds = task
+    return level, [(seed, analyze_level(build_level(level, seed))["score"]) for seed in seeds]
+
+def make_tasks(levels, samples, seed_start):
+    for level in levels:
+        for seeds in seed_batches(samples, seed_start):
+            yield level, seeds
+
+def search_seeds(levels, samples, band, seed_start=0, jobs=None):
+    # -> {level: {"seeds": [...], "score": [lo, hi], "spread": [min, median, max]}}
+    scored = {level: [] for level in levels}
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        for level, results in pool.map(score_batch, make_tasks(levels, samples, seed_start)):
+            scored[level].extend(results)
+    table = {}
+    for level, results in scored.items():
+        scores = sorted(score for _, score in results)
+        lo, hi = nearest_rank(scores, band[0]), nearest_rank(scores, band[1])
+        table[level] = {
+            "seeds": sorted(seed for seed, score in results if lo <= score <= hi),
+            "score": [round(lo, 1), round(hi, 1)],
+            "spread": [round(scores[0], 1), round(nearest_rank(scores, 50), 1), round(scores[-1], 1)],
+        }
+    return table
+
+# ---------- seed tables ----------
+def save_seed_table(path, table, band, samples):
+    data = {"version": SEED_TABLE_VERSION, "band": list(band), "samples": samples,
+            "levels": {str(level): entry for level, entry in sorted(table.items())}}
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def load_seed_table(path):
+    # {level: [seeds]} as MazeState(seed_table=...) takes it
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("version") != SEED_TABLE_VERSION:
+        raise ValueError(f"{path}: unsupported seed table version {data.get('version')}")
+    return {int(level): entry["seeds"] for level, entry in data["levels"].items() if entry["seeds"]}
+
+# ---------- main ----------
+def parse_band(text):
+    lo, _, hi = text.partition("-")
+    try:
+        band = (float(lo), float(hi))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"band must look like 40-60, not {text!r}")
+    if not 0 <= band[0] <= band[1] <= 100:
+        raise argparse.ArgumentTypeError("band percentiles run from 0 to 100, low first")
+    return band
+
+def show(level, seed):
+    t0 = time.perf_counter()
+    lv = build_level(level, seed)
+    t1 = time.perf_counter()
+    m = analyze_level(lv)
+    t2 = time.perf_counter()
+    print(f"level {level} seed {seed} ({lv.grid.width}x{lv.grid.height}): built in {(t1 - t0) * 1000:.1f} ms, "
+          f"analyzed in {(t2 - t1) * 1000:.2f} ms")
+    print(f"  solution {m['solution']}  dead ends {m['dead_ends']}  junctions {m['junctions']}  "
+          f"branching {m['branching']:.3f}  corridor {m['corridor']:.2f}  off path {m['off_path']:.1%}")
+    print(f"  score {m['score']:.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find Maze Dungeon seeds of matching difficulty")
+    parser.add_argument("--levels", type=parse_levels, default=sorted(LEVEL_MAP), help='levels to search (default "all")')
+    parser.add_argument("--samples", type=int, default=1000, help="seeds scored per level (default 1000)")
+    parser.add_argument("--band", type=parse_band, default=(40.0, 60.0),
+                        help="score percentiles kept, within each level (default 40-60)")
+    parser.add_argument("--seed-start", type=int, default=0, help="first seed (default 0)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--out", help="seed table to write (JSON)")
+    parser.add_argument("--show", nargs=2, type=int, metavar=("LEVEL", "SEED"), help="print one maze's metrics")
+    args = parser.parse_args(argv)
+
+    if args.show:
+        show(*args.show)
+        return 0
+    if not args.out:
+        parser.error("pass --out to write a seed table or --show LEVEL SEED")
+    if args.samples < 1:
+        parser.error("--samples must be at least 1")
+    t0 = time.perf_counter()
+    table = search_seeds(args.levels, args.samples, args.band, args.seed_start, args.jobs)
+    dt = time.perf_counter() - t0
+    scored = len(args.levels) * args.samples
+    print(f"{scored} mazes scored in {dt:.2f}s ({scored / dt if dt > 0 else float('inf'):,.0f}/s)")
+    for level, entry in sorted(table.items()):
+        lo, hi = entry["score"]
+        print(f"  level {level:>2}: {len(entry['seeds']):>5} seeds, score {lo:.0f}-{hi:.0f}"
+              f" (all: {entry['spread'][0]:.0f} / {entry['spread'][1]:.0f} / {entry['spread'][2]:.0f})")
+    save_seed_table(args.out, table, args.band, args.samples)
+    print("Wrote", args.out)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
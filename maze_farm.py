@@ -0,0 +1,167 @@
+"""
+maze_farm.py
+Batch maze generation across a process pool, validated and streamed to gzip JSONL (no display needed).
+- N mazes per chosen level (LEVEL_MAP size, extra walls and all) or per custom WxH size
+- Every maze is checked: closed border, every floor tile connected, exit reachable,
+  solution length (optionally kept only within --min-solution/--max-solution)
+- Seeds run from --seed-start upwards, so the same command always writes the same file
+
+    python maze_farm.py --levels 1-10 --count 500 --out event_seeds.jsonl.gz
+    python maze_farm.py --size 301x301 --count 100 --tiles --out big.jsonl.gz
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from maze_core import LEVEL_MAP, MAZE_ALGORITHMS, DEFAULT_MAZE_ALGORITHM, build_level
+
+BATCH_SIZE = 32          # mazes per worker task
+IN_FLIGHT_PER_WORKER = 4  # tasks queued ahead per worker (bounds memory on huge runs)
+
+# ---------- validation ----------
+def validate_level(lv):
+    # list of problems with a built Level; empty when it is playable
+    grid = lv.grid
+    w, cells = grid.width, grid.cells
+    errors = []
+    border = cells[:w] + cells[-w:] + cells[::w] + cells[w - 1::w]
+    if border.count(0):
+        errors.append("open border")
+    reachable = len(lv.dist_from_start) - lv.dist_from_start.count(-1)
+    if reachable != grid.open_count():
+        errors.append(f"disconnected: {grid.open_count() - reachable} floor tiles unreachable")
+    if lv.solution_length <= 0:
+        errors.append("exit unreachable" if lv.solution_length < 0 else "exit on start")
+    return errors
+
+def farm_record(lv, algorithm, tiles=False):
+    grid = lv.grid
+    errors = validate_level(lv)
+    record = {
+        "level": lv.number, "width": grid.width, "height": grid.height, "seed": lv.seed,
+        "algorithm": algorithm, "start": lv.start, "exit": lv.exit,
+        "solution": lv.solution_length, "open": grid.open_count(),
+        "ok": not errors, "errors": errors,
+    }
+    if tiles:
+        record["tiles"] = base64.b64encode(grid.pack()).decode("ascii")
+    return record
+
+# ---------- workers ----------
+def farm_batch(task):
+    # worker entry point: build and validate one batch; returns (JSON lines, valid, invalid, skipped)
+    level, size, algorithm, seeds, tiles, min_solution, max_solution = task
+    lines = []
+    valid = invalid = skipped = 0
+    for seed in seeds:
+        lv = build_level(level, seed, algorithm, size=size)
+        record = farm_record(lv, algorithm, tiles)
+        if not record["ok"]:
+            invalid += 1
+        elif not (min_solution <= record["solution"] <= max_solution):
+            skipped += 1
+            continue
+        else:
+            valid += 1
+        lines.append(json.dumps(record, separators=(",", ":")))
+    return lines, valid, invalid, skipped
+
+def seed_batches(count, seed_start=0, batch_size=BATCH_SIZE):
+    # `count` consecutive seeds from seed_start, as lists of at most batch_size (one per task)
+    for lo in range(seed_start, seed_start + count, batch_size):
+        yield list(range(lo, min(seed_start + count, lo + batch_size)))
+
+def make_tasks(targets, count, seed_start, algorithm, tiles, min_solution, max_solution):
+    # targets: [(level, size or None)]; yields batches of consecutive seeds per target
+    for level, size in targets:
+        for seeds in seed_batches(count, seed_start):
+            yield (level, size, algorithm, seeds, tiles, min_solution, max_solution)
+
+def run_farm(tasks, out, jobs=None):
+    # results are written in task order while later batches are still being built
+    jobs = jobs or os.cpu_count() or 1
+    totals = {"valid": 0, "invalid": 0, "skipped": 0}
+    pending = deque()
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            while len(pending) < jobs * IN_FLIGHT_PER_WORKER:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                pending.append(pool.submit(farm_batch, task))
+            if not pending:
+                break
+            lines, valid, invalid, skipped = pending.popleft().result()
+            if lines:
+                out.write("\n".join(lines) + "\n")
+            totals["valid"] += valid
+            totals["invalid"] += invalid
+            totals["skipped"] += skipped
+    return totals
+
+# ---------- main ----------
+def parse_levels(text):
+    # "3", "1,4,7", "2-5" or "all"
+    if text == "all":
+        return sorted(LEVEL_MAP)
+    levels = []
+    for part in text.split(","):
+        lo, _, hi = part.partition("-")
+        levels.extend(range(int(lo), int(hi or lo) + 1))
+    unknown = [lv for lv in levels if lv not in LEVEL_MAP]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown levels: {unknown}")
+    return levels
+
+def parse_size(text):
+    w, _, h = text.lower().partition("x")
+    try:
+        size = (int(w), int(h))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"size must look like 301x301, not {text!r}")
+    if min(size) < 3:
+        raise argparse.ArgumentTypeError("sizes start at 3x3")
+    return size
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and validate Maze Dungeon mazes in bulk")
+    parser.add_argument("--levels", type=parse_levels, default=None, help='levels to build: "3", "1,4,7", "2-5" or "all"')
+    parser.add_argument("--size", type=parse_size, action="append", default=[],
+                        help="custom WxH maze (repeatable); built as --size-level")
+    parser.add_argument("--size-level", type=int, default=1, help="level whose extra-wall density custom sizes get (default 1: none)")
+    parser.add_argument("--count", type=int, default=100, help="mazes per level/size (default 100)")
+    parser.add_argument("--seed-start", type=int, default=0, help="first seed (default 0)")
+    parser.add_argument("--algorithm", choices=sorted(MAZE_ALGORITHMS), default=DEFAULT_MAZE_ALGORITHM)
+    parser.add_argument("--min-solution", type=int, default=0, help="keep only mazes with a solution at least this long")
+    parser.add_argument("--max-solution", type=int, default=sys.maxsize, help="keep only mazes with a solution at most this long")
+    parser.add_argument("--tiles", action="store_true", help="include the tiles (base64, one bit per tile)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--out", required=True, help="output path (.jsonl.gz)")
+    args = parser.parse_args(argv)
+
+    targets = [(level, None) for level in (args.levels or [])]
+    targets += [(args.size_level, size) for size in args.size]
+    if not targets:
+        parser.error("nothing to build: pass --levels and/or --size")
+    tasks = make_tasks(targets, args.count, args.seed_start, args.algorithm, args.tiles,
+                       args.min_solution, args.max_solution)
+    t0 = time.perf_counter()
+    with gzip.open(args.out, "wt", encoding="utf-8") as out:
+        totals = run_farm(tasks, out, args.jobs)
+    dt = time.perf_counter() - t0
+    built = len(targets) * args.count
+    print(f"{built} mazes in {dt:.2f}s ({built / dt if dt > 0 else float('inf'):,.0f}/s): "
+          f"{totals['valid']} valid, {totals['invalid']} invalid, {totals['skipped']} outside the solution range")
+    print("Wrote", args.out)
+    return 1 if totals["invalid"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+"""
+maze_journal.py
+Journal of every completed run, with an in-memory index (no display needed).
+- runs.jsonl: one JSON line per run, appended by a writer thread and fsync'd in batches
+- snapshot.json: compacted index plus the journal offset it covers, replaced atomically
+- Each compaction truncates the journal it folded into the snapshot, so neither file grows without bound
+- Startup loads the snapshot and replays only the journal tail written after it
+- Several game instances can share the directory: appends never overwrite each other
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from bisect import bisect_left, insort
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+JOURNAL_FILE = "runs.jsonl"
+SNAPSHOT_FILE = "snapshot.json"
+LOCK_FILE = "journal.lock"
+SNAPSHOT_VERSION = 2
+FSYNC_INTERVAL = 1.0     # seconds between fsyncs while runs keep arriving
+COMPACT_EVERY = 100      # journal lines written before the snapshot is refreshed
+LEADERBOARD_SIZE = 10    # fastest runs kept per level
+TIMES_KEPT = 1000        # latest run times kept per level for rank/percentile
+
+# ---------- locking ----------
+class _FileLock:
+    """Exclusive advisory lock on a small side file, shared by every instance."""
+
+    def __init__(self, path):
+        self.path = path
+        self.f = None
+
+    def __enter__(self):
+        self.f = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.f.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                self.f.seek(0)
+                msvcrt.locking(self.f.fileno(), msvcrt.LK_LOCK, 1)
+        except OSError as e:
+            print("Journal lock fail:", e)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                self.f.seek(0)
+                msvcrt.locking(self.f.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        self.f.close()
+        self.f = None
+
+# ---------- index ----------
+class RunIndex:
+    """Per-level run counts, a small leaderboard and the latest run times.
+
+    count() and best() cover every run ever added; rank/percentile compare against
+    the last `keep` times on the level, so memory and the snapshot stay bounded.
+    best() is O(1); rank/percentile are a bisect, O(log keep); adding a run is an
+    insort (plus one delete once the window is full) into a flat list of floats.
+    """
+
+    def __init__(self, keep=TIMES_KEPT):
+        self.keep = keep
+        self.times = {}        # level -> sorted list of the latest `keep` times (seconds)
+        self.recent = {}       # level -> deque of the same times, oldest first
+        self.counts = {}       # level -> runs ever added
+        self.top = {}          # level -> up to LEADERBOARD_SIZE fastest run dicts, fastest first
+        self.total = 0
+
+    def add(self, run):
+        level = run["level"]
+        t = run["time"]
+        times = self.times.setdefault(level, [])
+        recent = self.recent.setdefault(level, deque())
+        insort(times, t)
+        recent.append(t)
+        if len(recent) > self.keep:
+            del times[bisect_left(times, recent.popleft())]
+        self.counts[level] = self.counts.get(level, 0) + 1
+        top = self.top.setdefault(level, [])
+        if len(top) < LEADERBOARD_SIZE or t < top[-1]["time"]:
+            top.insert(bisect_left([r["time"] for r in top], t), run)
+            del top[LEADERBOARD_SIZE:]
+        self.total += 1
+
+    def best(self, level):
+        top = self.top.get(level)
+        return top[0]["time"] if top else None
+
+    def count(self, level=None):
+        if level is None:
+            return self.total
+        return self.counts.get(level, 0)
+
+    def rank(self, level, t):
+        # how many of the latest runs on `level` were strictly faster than t
+        return bisect_left(self.times.get(level, ()), t)
+
+    def percentile(self, level, t):
+        # share of the latest runs (0..100) that t beats or ties; None with no runs yet
+        times = self.times.get(level)
+        if not times:
+            return None
+        return 100.0 * (len(times) - bisect_left(times, t)) / len(times)
+
+    def leaderboard(self, level, n=LEADERBOARD_SIZE):
+        return list(self.top.get(level, ())[:n])
+
+    def to_json(self):
+        return {
+            "total": self.total,
+            "levels": {str(level): {"count": self.counts[level], "recent": list(recent), "top": self.top.get(level, [])}
+                       for level, recent in self.recent.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        index = cls()
+        index.total = data.get("total", 0)
+        for key, entry in data.get("levels", {}).items():
+            level = int(key)
+            index.recent[level] = deque(entry["recent"][-index.keep:])
+            index.times[level] = sorted(index.recent[level])
+            index.counts[level] = entry["count"]
+            index.top[level] = entry["top"]
+        return index
+
+# ---------- journal ----------
+class RunJournal:
+    """Completed runs, persisted off the main thread.
+
+    record() updates the index at once and hands the run to a writer thread,
+    so nothing on the game loop waits for the disk. The writer fsyncs at most
+    every fsync_interval seconds and, every compact_every lines, rewrites the
+    snapshot (under the shared lock, after catching up with lines other
+    instances appended) and truncates the journal it now covers.
+
+    Retention: the snapshot is the durable record once a run is folded into it.
+    It keeps every level's run count, its LEADERBOARD_SIZE fastest runs and the
+    times of its latest TIMES_KEPT runs; older runs' other fields are dropped.
+    The journal starts with a {"generation": n} line, bumped on every truncation
+    so other instances know to reload the snapshot before replaying it.
+    """
+
+    def __init__(self, directory, legacy_records=None, fsync_interval=FSYNC_INTERVAL, compact_every=COMPACT_EVERY):
+        self.directory = directory
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.lock = _FileLock(os.path.join(directory, LOCK_FILE))
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.index = RunIndex()
+        self.index_lock = threading.Lock()
+        self.generation = 0      # journal generation self.offset refers to
+        self.offset = 0          # journal bytes already folded into the index
+        self.own_ids = set()     # our lines not yet seen by a tail replay
+        self.unwritten = {}      # id -> our runs still queued for the writer
+        self.queue = queue.Queue()
+        self.thread = None
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            self.load()
+            if legacy_records and self.index.total == 0:
+                self.migrate(legacy_records)
+        self.thread = threading.Thread(target=self.writer, name="run-journal", daemon=True)
+        self.thread.start()
+
+    # ----- startup -----
+    def load(self):
+        # index from the snapshot plus the journal after it; caller holds the lock. Also used
+        # when another instance truncated the journal: our runs still queued are added back.
+        index, generation, offset = RunIndex(), 0, 0
+        try:
+            with open(self.snapshot_path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == SNAPSHOT_VERSION:
+                index = RunIndex.from_json(data["index"])
+                generation = data["generation"]
+                offset = data["offset"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print("Journal snapshot unreadable, replaying journal:", e)
+            index, generation, offset = RunIndex(), 0, 0
+        on_disk, header = self.journal_header()
+        if on_disk is None:
+            on_disk = generation + 1
+            header = self.start_journal(on_disk)
+        if on_disk != generation:
+            offset = header  # truncated after that snapshot was written: every line is newer
+        with self.index_lock:
+            for run in self.unwritten.values():
+                index.add(run)
+            self.index = index
+            self.own_ids = set(self.unwritten)
+        self.generation = on_disk
+        self.offset = offset
+        self.replay_tail()
+
+    def journal_header(self):
+        # (generation, header bytes) of the journal on disk; (None, 0) if it is missing or
+        # empty, generation 0 for a journal written before truncation existed
+        try:
+            with open(self.journal_path, "rb") as f:
+                first = f.readline()
+        except FileNotFoundError:
+            return None, 0
+        if not first:
+            return None, 0
+        try:
+            return json.loads(first)["generation"], len(first)
+        except (ValueError, KeyError, TypeError):
+            return 0, 0
+
+    def start_journal(self, generation):
+        # truncate the journal to just its header; caller holds the lock and has folded
+        # every complete line into the snapshot. Returns the header's length.
+        header = (json.dumps({"generation": generation}) + "\n").encode()
+        with open(self.journal_path, "wb") as f:
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(header)
+
+    def replay_tail(self):
+        # fold in complete lines written after self.offset (by anyone); caller holds the lock
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1  # a half-written last line is left for next time
+        with self.index_lock:
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                if run.get("id") in self.own_ids:
+                    self.own_ids.discard(run["id"])  # already indexed when recorded
+                    continue
+                self.index.add(run)
+            self.offset += end
+
+    def migrate(self, legacy_records):
+        # best times from the old {"<level>": seconds} records file become imported runs
+        lines = []
+        for key, t in sorted(legacy_records.items(), key=lambda kv: int(kv[0])):
+            run = {"id": uuid.uuid4().hex, "level": int(key), "time": float(t), "seed": None,
+                   "moves": None, "hints": None, "ts": None, "imported": True}
+            lines.append(json.dumps(run, separators=(",", ":")) + "\n")
+        if not lines:
+            return
+        with open(self.journal_path, "a") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self.replay_tail()
+
+    # ----- queries -----
+    def best(self, level):
+        with self.index_lock:
+            return self.index.best(level)
+
+    def percentile(self, level, t):
+        with self.index_lock:
+            return self.index.percentile(level, t)
+
+    def leaderboard(self, level, n=LEADERBOARD_SIZE):
+        with self.index_lock:
+            return self.index.leaderboard(level, n)
+
+    def count(self, level=None):
+        with self.index_lock:
+            return self.index.count(level)
+
+    # ----- writing -----
+    def record(self, run):
+        # run: MazeState.complete_level() dict; returns the previous best for its level
+        entry = {"id": uuid.uuid4().hex, "level": run["level"], "seed": run.get("seed"),
+                 "time": round(run["time"], 3), "moves": run.get("moves"), "hints": run.get("hints"),
+                 "ts": round(time.time(), 3)}
+        with self.index_lock:
+            prev_best = self.index.best(entry["level"])
+            self.index.add(entry)
+            self.own_ids.add(entry["id"])
+            self.unwritten[entry["id"]] = entry
+        self.queue.put(entry)
+        return prev_best
+
+    def writer(self):
+        pending = 0        # lines written but not yet fsync'd
+        since_compact = 0
+        last_sync = time.monotonic()
+        f = None
+        try:
+            f = open(self.journal_path, "a")
+            while True:
+                timeout = None if pending == 0 else max(0.0, self.fsync_interval - (time.monotonic() - last_sync))
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = ""
+                if item is None:
+                    break
+                # drain whatever else is queued into the same write
+                runs = [item] if item else []
+                stop = False
+                while True:
+                    try:
+                        more = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if more is None:
+                        stop = True
+                        break
+                    runs.append(more)
+                if runs:
+                    # one append per batch; O_APPEND keeps instances apart and the lock keeps
+                    # it out of another instance's truncation
+                    with self.lock:
+                        f.write("".join(json.dumps(run, separators=(",", ":")) + "\n" for run in runs))
+                        f.flush()
+                    with self.index_lock:
+                        for run in runs:
+                            del self.unwritten[run["id"]]
+                    pending += len(runs)
+                    since_compact += len(runs)
+                if pending and (stop or time.monotonic() - last_sync >= self.fsync_interval):
+                    os.fsync(f.fileno())
+                    pending = 0
+                    last_sync = time.monotonic()
+                if since_compact >= self.compact_every:
+                    self.compact()
+                    since_compact = 0
+                if stop:
+                    break
+            if pending:
+                os.fsync(f.fileno())
+        except Exception as e:
+            print("Journal write fail:", e)
+        finally:
+            if f is not None:
+                f.close()
+
+    def compact(self):
+        # catch up with every instance's lines (reloading the snapshot if another instance
+        # truncated the journal meanwhile), atomically replace the snapshot, then truncate the
+        # journal it covers
+        try:
+            with self.lock:
+                if self.journal_header()[0] != self.generation:
+                    self.load()
+                else:
+                    self.replay_tail()
+                with self.index_lock:
+                    data = {"version": SNAPSHOT_VERSION, "generation": self.generation, "offset": self.offset,
+                            "index": self.index.to_json()}
+                tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.snapshot_path)
+                self.offset = self.start_journal(self.generation + 1)
+                self.generation += 1
+        except Exception as e:
+            print("Journal compact fail:", e)
+
+    def close(self):
+        # flush and fsync everything queued, refresh the snapshot, stop the writer
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        self.compact()
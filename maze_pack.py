@@ -0,0 +1,193 @@
+"""
+maze_pack.py
+Level packs: many finished levels in one binary file, one bit per tile (no display needed).
+- Header, then one record per level (dimensions, seed, start, exit, solution length, tiles),
+  then an index of (offset, level) so any record is found without reading the others
+- Read through mmap: opening a pack touches only the header and index, and loading one
+  level reads one record
+- python Maze.py --pack FILE plays levels straight from a pack; the header names the generator
+  version, since replays of those sessions rebuild levels from their seeds
+
+    python maze_pack.py --levels 1-10 --count 1000 --out levels.mzpk
+    python maze_pack.py --info levels.mzpk
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from maze_core import Grid, Level, LEVEL_MAP, GENERATOR_VERSION, bfs_distances, build_level, NO_HOP
+from maze_farm import validate_level, parse_levels
+
+PACK_MAGIC = b"MZPK"
+PACK_VERSION = 1
+HEADER = struct.Struct("<4sHHIQ")       # magic, version, generator version, count, index offset
+RECORD = struct.Struct("<HHHqHHHHI")    # level, width, height, seed, start x/y, exit x/y, solution
+INDEX_ENTRY = struct.Struct("<QI")      # record offset, level
+
+# ---------- records ----------
+def pack_record(lv):
+    # one Level as record bytes: the fixed header, then the tiles one bit each
+    grid = lv.grid
+    head = RECORD.pack(lv.number, grid.width, grid.height, lv.seed,
+                       lv.start[0], lv.start[1], lv.exit[0], lv.exit[1], lv.solution_length)
+    return head + grid.pack()
+
+def build_record(job):
+    # worker entry point: (level, seed) -> record bytes, or None if the level fails validation
+    level, seed = job
+    lv = build_level(level, seed)
+    return None if validate_level(lv) else pack_record(lv)
+
+def level_from_grid(number, seed, grid, start, exit):
+    # the distance fields and hint table a stored level leaves out (two BFS passes)
+    w = grid.width
+    from_start = bfs_distances(grid, start[1] * w + start[0])
+    hops = bytearray([NO_HOP]) * len(grid.cells)
+    to_exit = bfs_distances(grid, exit[1] * w + exit[0], hops)
+    return Level(number, seed, grid, start, exit, from_start, to_exit, hops)
+
+# ---------- writing ----------
+class LevelPackWriter:
+    """Streams records to a new pack; the index and final header are written by close()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, GENERATOR_VERSION, 0, 0))
+        self.index = []
+
+    def add(self, record):
+        # record: bytes from pack_record()
+        level = RECORD.unpack_from(record)[0]
+        self.index.append(INDEX_ENTRY.pack(self.f.tell(), level))
+        self.f.write(record)
+
+    def close(self):
+        index_offset = self.f.tell()
+        self.f.write(b"".join(self.index))
+        self.f.seek(0)
+        self.f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, GENERATOR_VERSION, len(self.index), index_offset))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------- reading ----------
+class LevelPack:
+    """A pack file mapped read-only. entry(i) reads one record's header and tiles
+    (microseconds); level(i) also rebuilds the hint table; pick(level) is a random
+    stored level with that number, for the game. generator is the GENERATOR_VERSION
+    the pack was built with (0 for packs that predate the field).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.generator, self.count, self.index_offset = HEADER.unpack_from(self.mm)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{path}: not a level pack")
+        if version != PACK_VERSION:
+            raise ValueError(f"{path}: unsupported pack version {version}")
+        if self.index_offset + self.count * INDEX_ENTRY.size > len(self.mm):
+            raise ValueError(f"{path}: truncated pack")
+        self.by_level = {}  # level number -> entry numbers, from the index alone
+        index = self.mm[self.index_offset:self.index_offset + self.count * INDEX_ENTRY.size]
+        for i, (_, level) in enumerate(INDEX_ENTRY.iter_unpack(index)):
+            self.by_level.setdefault(level, []).append(i)
+        self.rng = random.Random()
+
+    def __len__(self):
+        return self.count
+
+    def offset(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return INDEX_ENTRY.unpack_from(self.mm, self.index_offset + i * INDEX_ENTRY.size)[0]
+
+    def entry(self, i):
+        # stored fields of record i plus its Grid, without the distance tables
+        o = self.offset(i)
+        level, w, h, seed, sx, sy, ex, ey, solution = RECORD.unpack_from(self.mm, o)
+        o += RECORD.size
+        grid = Grid.unpack(w, h, self.mm[o:o + (w * h + 7) // 8])
+        return {"level": level, "seed": seed, "grid": grid, "start": (sx, sy), "exit": (ex, ey), "solution": solution}
+
+    def level(self, i):
+        e = self.entry(i)
+        return level_from_grid(e["level"], e["seed"], e["grid"], e["start"], e["exit"])
+
+    def pick(self, level):
+        # a random stored level numbered `level`, or None if the pack has none
+        entries = self.by_level.get(level)
+        if not entries:
+            return None
+        return self.level(self.rng.choice(entries))
+
+    def close(self):
+        self.mm.close()
+
+# ---------- main ----------
+def build_pack(path, levels, count, seed_start=0, jobs=None):
+    jobs_list = [(level, seed) for level in levels for seed in range(seed_start, seed_start + count)]
+    written = rejected = 0
+    with LevelPackWriter(path) as writer, ProcessPoolExecutor(max_workers=jobs) as pool:
+        for record in pool.map(build_record, jobs_list, chunksize=32):
+            if record is None:
+                rejected += 1
+            else:
+                writer.add(record)
+                written += 1
+    return written, rejected
+
+def print_info(path, samples=2000):
+    pack = LevelPack(path)
+    print(f"{path}: {len(pack)} levels, {os.path.getsize(path):,} bytes, generator version {pack.generator}"
+          + ("" if pack.generator == GENERATOR_VERSION else f" (this is {GENERATOR_VERSION}: rebuild it to play)"))
+    for level in sorted(pack.by_level):
+        print(f"  level {level:>2}: {len(pack.by_level[level])}")
+    if len(pack):
+        picks = [random.randrange(len(pack)) for _ in range(samples)]
+        t0 = time.perf_counter()
+        for i in picks:
+            pack.entry(i)
+        t1 = time.perf_counter()
+        for i in picks[:samples // 10]:
+            pack.level(i)
+        t2 = time.perf_counter()
+        print(f"random entry(): {(t1 - t0) / samples * 1e6:.1f} us, level() with hint table: "
+              f"{(t2 - t1) / max(1, samples // 10) * 1e6:.1f} us")
+    pack.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect Maze Dungeon level packs")
+    parser.add_argument("--levels", type=parse_levels, default=sorted(LEVEL_MAP), help='levels to build (default "all")')
+    parser.add_argument("--count", type=int, default=100, help="levels per level number (default 100)")
+    parser.add_argument("--seed-start", type=int, default=0, help="first seed (default 0)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--out", help="pack to write")
+    parser.add_argument("--info", metavar="PATH", help="list a pack's contents and time random loads")
+    args = parser.parse_args(argv)
+
+    if args.info:
+        print_info(args.info)
+        return 0
+    if not args.out:
+        parser.error("pass --out to build a pack or --info to inspect one")
+    t0 = time.perf_counter()
+    written, rejected = build_pack(args.out, args.levels, args.count, args.seed_start, args.jobs)
+    print(f"Wrote {written} levels to {args.out} in {time.perf_counter() - t0:.2f}s"
+          + (f" ({rejected} failed validation and were left out)" if rejected else ""))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
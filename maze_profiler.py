@@ -0,0 +1,145 @@
+"""
+maze_profiler.py
+Per-frame phase timings and counters for the game loop (no display needed).
+- Phases (input, maze, minimap, hud, flip, frame) timed with perf_counter every frame
+- Rolling p50/p95/p99 per phase over the last PROFILE_WINDOW frames
+- Counters (draw calls, font renders, surface allocations) per frame and in total
+- Optional JSONL export: one line per frame plus periodic tracemalloc snapshots
+
+    python Maze.py --profile frames.jsonl     (F3 in game shows the overlay)
+"""
+
+import json
+import time
+import tracemalloc
+from collections import deque
+
+PROFILE_WINDOW = 600        # frames kept for the rolling percentiles
+PERCENTILES = (50, 95, 99)
+PHASES = ("input", "maze", "minimap", "hud", "flip", "frame")
+SNAPSHOT_SEC = 10.0         # seconds between tracemalloc snapshots while exporting
+SNAPSHOT_TOP = 10           # allocation sites listed per snapshot
+
+def nearest_rank(sorted_values, p):
+    # nearest-rank percentile p (0..100) of an already sorted, non-empty sequence
+    n = len(sorted_values)
+    return sorted_values[min(n - 1, max(0, int(-(-p * n // 100)) - 1))]
+
+class FrameProfiler:
+    """Collects what one frame spent where, and keeps a rolling window of it.
+
+    The game calls begin_frame(), add(phase, seconds) and count(name) while it
+    works, then end_frame(); a phase not seen in a frame counts as 0 for it.
+    Costs a few dict updates per frame, so it is always on; only the export
+    (and tracemalloc, which slows everything down) is opt-in.
+    """
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.history = {phase: deque(maxlen=window) for phase in PHASES}
+        self.phases = {}          # this frame: phase -> seconds
+        self.counts = {}          # this frame: counter -> n
+        self.last_counts = {}     # the previous frame's counters (for the overlay)
+        self.totals = {}          # counter -> n since start
+        self.frames = 0
+        self.frame_start = None
+        self.export = None
+        self.next_snapshot = 0.0
+
+    # ----- collection -----
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def spent(self, phase):
+        # seconds this frame has spent in `phase` so far
+        return self.phases.get(phase, 0.0)
+
+    def end_frame(self, **info):
+        # info (level, dirty rect count, ...) only goes into the export line
+        if self.frame_start is None:
+            return
+        self.add("frame", time.perf_counter() - self.frame_start)
+        self.frame_start = None
+        phases = self.phases
+        for phase, samples in self.history.items():
+            samples.append(phases.get(phase, 0.0))
+        for name, n in self.counts.items():
+            self.totals[name] = self.totals.get(name, 0) + n
+        self.frames += 1
+        if self.export is not None:
+            self.write_frame(info)
+        self.last_counts = self.counts
+        self.phases = {}
+        self.counts = {}
+
+    # ----- queries -----
+    def percentiles(self, phase):
+        # nearest-rank (p50, p95, p99) in seconds over the window; zeros before any frame
+        samples = sorted(self.history[phase])
+        if not samples:
+            return tuple(0.0 for _ in PERCENTILES)
+        return tuple(nearest_rank(samples, p) for p in PERCENTILES)
+
+    def summary(self):
+        return [(phase,) + self.percentiles(phase) for phase in PHASES]
+
+    # ----- export -----
+    def start_export(self, path):
+        try:
+            self.export = open(path, "w")
+        except Exception as e:
+            print("Profile export disabled:", e)
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.next_snapshot = time.monotonic()
+
+    def write_frame(self, info):
+        line = {"type": "frame", "n": self.frames, "t": round(time.time(), 4),
+                "ms": {phase: round(sec * 1000.0, 3) for phase, sec in self.phases.items()},
+                "counts": self.counts}
+        line.update(info)
+        try:
+            self.export.write(json.dumps(line, separators=(",", ":")) + "\n")
+            if time.monotonic() >= self.next_snapshot:
+                self.write_snapshot()
+        except Exception as e:
+            print("Profile export fail:", e)
+            self.close()
+
+    def note(self, kind, **data):
+        # a one-off line in the export (startup timings, ...); ignored when not exporting
+        if self.export is None:
+            return
+        line = {"type": kind, "n": self.frames, "t": round(time.time(), 4)}
+        line.update(data)
+        self.export.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    def write_snapshot(self):
+        # current/peak traced memory and the biggest allocation sites right now
+        self.next_snapshot = time.monotonic() + SNAPSHOT_SEC
+        current, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().statistics("lineno")[:SNAPSHOT_TOP]
+        top = [{"where": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "bytes": s.size, "blocks": s.count}
+               for s in stats]
+        line = {"type": "memory", "n": self.frames, "t": round(time.time(), 4),
+                "current": current, "peak": peak, "top": top}
+        self.export.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self.export.flush()
+
+    def close(self):
+        if self.export is None:
+            return
+        try:
+            self.export.write(json.dumps({"type": "totals", "frames": self.frames, "counts": self.totals}) + "\n")
+            self.export.close()
+        except Exception as e:
+            print("Profile export fail:", e)
+        self.export = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -0,0 +1,242 @@
+"""
+maze_replay.py
+Compact input recordings of MazeState sessions and exact playback (no display needed).
+- A recording is a short header plus one varint per input: ms since the previous input and the action
+- Level starts also carry the level and seed, so playback rebuilds the very same mazes; the
+  header names the generator version, and recordings from another one are refused
+- Playback drives a MazeState on a simulated clock: behind the game window in real time
+  (python Maze.py --replay FILE) or headless as fast as it will go (this script)
+
+    python maze_replay.py ~/.maze_dungeon/replays/20261017-101500.mzr
+"""
+
+import argparse
+import sys
+import time
+
+from maze_core import MazeState, ACTION_DELTAS, ACTION_HINT, EVENT_EXIT, GENERATOR_VERSION
+
+MAGIC = b"MZRP"
+REPLAY_VERSION = 2
+FLAG_ENDLESS = 1
+CODE_LEVEL = 7      # ACTION_* codes (0..6) are inputs; 7 starts a level
+CODE_BITS = 3
+FLUSH_BYTES = 4096  # recorder buffer size before a write
+
+# ---------- varints ----------
+def write_varint(buf, n):
+    # unsigned LEB128: 7 bits per byte, high bit set on all but the last
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+def read_varint(data, pos):
+    n = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+def zigzag(n):
+    # signed -> unsigned so small negative seeds stay short
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+def unzigzag(n):
+    return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+# ---------- recording ----------
+class ReplayRecorder:
+    """Appends a MazeState's inputs to a binary file (or only memory when f is None).
+
+    Pass it as MazeState(recorder=...). A move costs one or two bytes; the buffer
+    goes to disk every FLUSH_BYTES, at each level start and on close, so a crash
+    loses at most the level in progress.
+    """
+
+    def __init__(self, f=None, flush_bytes=FLUSH_BYTES):
+        self.f = f
+        self.flush_bytes = flush_bytes
+        self.buf = bytearray()
+        self.data = bytearray()   # everything recorded so far when f is None
+        self.last_ms = None
+
+    def level_started(self, state):
+        if self.last_ms is None:
+            self.buf += MAGIC
+            self.buf.append(REPLAY_VERSION)
+            write_varint(self.buf, FLAG_ENDLESS if state.endless else 0)
+            write_varint(self.buf, GENERATOR_VERSION)
+            write_varint(self.buf, int(time.time() * 1000))
+        self.event(CODE_LEVEL, state.start_time)
+        write_varint(self.buf, state.level)
+        write_varint(self.buf, zigzag(state.seed_used))
+        self.flush()
+
+    def action(self, code, t):
+        self.event(code, t)
+        if len(self.buf) >= self.flush_bytes:
+            self.flush()
+
+    def event(self, code, t):
+        ms = int(round(t * 1000))
+        if self.last_ms is None:
+            self.last_ms = ms
+        dt = max(0, ms - self.last_ms)  # a wall clock stepping back just reads as "no delay"
+        self.last_ms += dt
+        write_varint(self.buf, (dt << CODE_BITS) | code)
+
+    def flush(self):
+        if not self.buf:
+            return
+        if self.f is None:
+            self.data += self.buf
+        else:
+            try:
+                self.f.write(self.buf)
+                self.f.flush()
+            except Exception as e:
+                print("Replay write fail:", e)
+        self.buf = bytearray()
+
+    def close(self):
+        self.flush()
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+# ---------- reading ----------
+def parse_replay(data):
+    # -> (header dict, [(ms since first event, code, level, seed)]); level/seed are None
+    # except on CODE_LEVEL. A truncated tail (crash mid-write) is dropped.
+    if data[:4] != MAGIC:
+        raise ValueError("not a maze replay")
+    if data[4] != REPLAY_VERSION:
+        raise ValueError(f"unsupported replay version {data[4]}")
+    flags, pos = read_varint(data, 5)
+    generator, pos = read_varint(data, pos)
+    if generator != GENERATOR_VERSION:
+        raise ValueError(f"replay was recorded with maze generator version {generator}, "
+                         f"this is version {GENERATOR_VERSION}: its levels would differ")
+    recorded_ms, pos = read_varint(data, pos)
+    header = {"endless": bool(flags & FLAG_ENDLESS), "generator": generator, "recorded_at": recorded_ms / 1000.0}
+    events = []
+    ms = 0
+    end = len(data)
+    try:
+        while pos < end:
+            word, pos = read_varint(data, pos)
+            ms += word >> CODE_BITS
+            code = word & ((1 << CODE_BITS) - 1)
+            if code == CODE_LEVEL:
+                level, pos = read_varint(data, pos)
+                seed, pos = read_varint(data, pos)
+                events.append((ms, code, level, unzigzag(seed)))
+            else:
+                events.append((ms, code, None, None))
+    except IndexError:
+        pass
+    if not events or events[0][1] != CODE_LEVEL:
+        raise ValueError("replay has no level start")
+    return header, events
+
+def load_replay(path):
+    with open(path, "rb") as f:
+        return parse_replay(f.read())
+
+# ---------- playback ----------
+class ReplayClock:
+    """MazeState clock that only moves when playback sets it."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class ReplayPlayer:
+    """Feeds a recording into a MazeState running on a ReplayClock.
+
+    Event times are offsets from base_time, so a player started at time.time()
+    plays in step with the wall clock, and one started at 0 just runs through.
+    advance_to(t) applies every event due by t through `apply` (default:
+    straight into the state); finished levels are collected in runs.
+    """
+
+    def __init__(self, header, events, base_time=0.0, visibility=True):
+        self.header = header
+        self.events = events
+        self.base_time = base_time
+        self.pos = 1
+        self.runs = []
+        ms, _, level, seed = events[0]
+        self.clock = ReplayClock(base_time + ms / 1000.0)
+        self.state = MazeState(level=level, fixed_seed=seed, endless=header["endless"],
+                               clock=self.clock, visibility=visibility)
+
+    def finished(self):
+        return self.pos >= len(self.events)
+
+    def next_time(self):
+        # when the next event is due, or None at the end
+        if self.finished():
+            return None
+        return self.base_time + self.events[self.pos][0] / 1000.0
+
+    def advance_to(self, t, apply=None):
+        apply = apply or self.apply
+        events = self.events
+        while self.pos < len(events):
+            event = events[self.pos]
+            at = self.base_time + event[0] / 1000.0
+            if at > t:
+                break
+            self.pos += 1
+            self.clock.now = at
+            apply(event)
+        self.clock.now = max(self.clock.now, t)
+
+    def run_to_end(self):
+        self.advance_to(float("inf"))
+        return self.runs
+
+    def apply(self, event):
+        _, code, level, seed = event
+        state = self.state
+        if code == CODE_LEVEL:
+            state.generate_for_level(level, seed=seed)
+        elif code == ACTION_HINT:
+            state.trigger_hint()
+        elif code < len(ACTION_DELTAS):
+            if state.try_move(*ACTION_DELTAS[code]) == EVENT_EXIT:
+                self.runs.append(state.complete_level())
+
+# ---------- main ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a Maze Dungeon replay headless")
+    parser.add_argument("path", help="replay file (.mzr)")
+    args = parser.parse_args(argv)
+
+    try:
+        header, events = load_replay(args.path)
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot read replay: {e}")
+    t0 = time.perf_counter()
+    player = ReplayPlayer(header, events, visibility=False)
+    runs = player.run_to_end()
+    dt = time.perf_counter() - t0
+    print(f"{len(events)} events, {events[-1][0] / 1000.0:.1f}s recorded, played in {dt * 1000:.1f} ms"
+          f" ({len(events) / dt if dt > 0 else float('inf'):,.0f} events/s)")
+    for run in runs:
+        print(f"  level {run['level']:>2}  seed {run['seed']:>10}  time {run['time']:8.3f}s"
+              f"  moves {run['moves']:>5} (shortest {run['shortest']})  hints {run['hints']}")
+    if header["endless"]:
+        print(f"  beacons found: {player.state.beacons_found}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+test_audio.py
+The array-based audio synthesis in Maze.py against the original list-based version.
+Both draw their noise from generators with the same seed, so the float samples agree to
+rounding error and the 16-bit PCM is byte-for-byte the same.
+
+    python -m unittest test_audio
+"""
+
+import math
+import random
+import struct
+import unittest
+
+from Maze import AUDIO_CLIPS, MAX_AMPLITUDE, SAMPLE_RATE, AMBIENT_LENGTH, clamp, encode_pcm16
+
+TOLERANCE = 1e-12  # max absolute sample difference (measured: about 2e-13)
+
+# ---------- reference: the list-based synthesis the arrays replaced ----------
+def ref_sine(freq, duration, vol=0.3, sr=SAMPLE_RATE):
+    total = int(duration * sr)
+    return [math.sin(2*math.pi*freq*(i/sr)) * vol for i in range(total)]
+
+def ref_noise(rng, duration, vol=0.2, sr=SAMPLE_RATE):
+    total = int(duration * sr)
+    return [rng.uniform(-1.0, 1.0)*vol for _ in range(total)]
+
+def ref_mix(signals):
+    length = max((len(s) for s in signals), default=0)
+    out = [0.0]*length
+    for s in signals:
+        for i, v in enumerate(s):
+            out[i] += v
+    maxv = max((abs(x) for x in out), default=1.0)
+    if maxv > 1.0:
+        out = [x/maxv for x in out]
+    return out
+
+def ref_pcm(samples):
+    return b"".join(struct.pack("<h", int(clamp(s, -1.0, 1.0)*MAX_AMPLITUDE)) for s in samples)
+
+def ref_ambient(tier, rng):
+    dur = AMBIENT_LENGTH
+    if tier == 1:
+        return ref_mix([ref_sine(60, dur, 0.18), ref_sine(140, dur, 0.06), ref_noise(rng, dur, 0.02)])
+    if tier == 2:
+        s1, s2, n = ref_sine(45, dur, 0.22), ref_sine(110, dur, 0.08), ref_noise(rng, dur, 0.03)
+        mod = [0.9 + 0.1*math.sin(2*math.pi*0.18*(i/SAMPLE_RATE)) for i in range(int(dur*SAMPLE_RATE))]
+    else:
+        s1, s2, n = ref_sine(32, dur, 0.28), ref_sine(90, dur, 0.09), ref_noise(rng, dur, 0.06)
+        mod = [0.85 + 0.15*math.sin(2*math.pi*0.35*(i/SAMPLE_RATE)) for i in range(int(dur*SAMPLE_RATE))]
+    raw = ref_mix([s1, s2, n])
+    return [raw[i]*mod[i] for i in range(len(raw))]
+
+def ref_exit(tier, rng):
+    if tier == 1:
+        a, b, n = ref_sine(200, 0.15, vol=0.6), ref_sine(320, 0.6, vol=0.22), ref_noise(rng, 0.9, 0.05)
+        core = ref_mix([a + [0]*int(0.45*SAMPLE_RATE), b, n])
+    elif tier == 2:
+        a, b, n = ref_sine(220, 0.45, vol=0.6), ref_sine(440, 0.7, vol=0.25), ref_noise(rng, 0.9, 0.06)
+        core = ref_mix([a + [0]*int(0.45*SAMPLE_RATE), b + [0]*int(0.2*SAMPLE_RATE), n])
+    else:
+        t = 1.6
+        s1, s2, n = ref_sine(120, t, vol=0.9), ref_sine(60, t, vol=0.6), ref_noise(rng, t, vol=0.35)
+        total = int(t*SAMPLE_RATE)
+        env = [(1.0 if (i/total) < 0.02 else math.exp(-6.0*((i/total)))) for i in range(total)]
+        base = ref_mix([s1, s2, n])
+        return [base[i]*env[i] for i in range(len(base))]
+    atten = [math.exp(-3.0*(i/SAMPLE_RATE)) for i in range(len(core))]
+    return [core[i]*atten[i] for i in range(len(core))]
+
+def ref_hint(tier, rng):
+    if tier == 1:
+        return ref_mix([ref_sine(660, 0.12, 0.35), ref_sine(880, 0.18, 0.18)])
+    if tier == 2:
+        return ref_mix([ref_sine(440, 0.14, 0.45), ref_sine(660, 0.16, 0.2), ref_noise(rng, 0.3, 0.02)])
+    return ref_mix([ref_sine(220, 0.25, 0.55), ref_noise(rng, 0.6, 0.06)])
+
+REFERENCE = {"ambient": ref_ambient, "exit": ref_exit, "hint": ref_hint}
+
+# ---------- tests ----------
+class SynthesisMatchesReference(unittest.TestCase):
+    def test_every_clip(self):
+        for kind, synth in AUDIO_CLIPS.items():
+            for tier in (1, 2, 3):
+                with self.subTest(kind=kind, tier=tier):
+                    new = synth(tier, rng=random.Random(f"test:{kind}:{tier}"))
+                    old = REFERENCE[kind](tier, random.Random(f"test:{kind}:{tier}"))
+                    self.assertEqual(len(new), len(old))
+                    worst = max(map(abs, map(float.__sub__, new, old)), default=0.0)
+                    self.assertLess(worst, TOLERANCE)
+                    self.assertEqual(encode_pcm16(new), ref_pcm(old))
+
+if __name__ == "__main__":
+    unittest.main()